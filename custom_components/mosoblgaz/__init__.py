@@ -4,6 +4,7 @@ __all__ = [
     "async_setup",
     "async_setup_entry",
     "async_unload_entry",
+    "async_remove_entry",
     "async_update_options",
     "async_migrate_entry",
     "DOMAIN",
@@ -16,17 +17,30 @@ __all__ = [
 import asyncio
 from functools import cached_property
 import logging
-from aiohttp import ClientTimeout
+import time
+from aiohttp import ClientSession, ClientTimeout, CookieJar, TCPConnector
 import voluptuous as vol
-from datetime import timedelta
-from typing import Any, Awaitable, Mapping, MutableMapping, Sequence, TypeVar, final
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Coroutine,
+    Final,
+    Mapping,
+    MutableMapping,
+    Sequence,
+    TypeVar,
+    final,
+)
 
 from homeassistant.helpers.issue_registry import IssueSeverity, async_create_issue
 from homeassistant.helpers import entity_registry
-from homeassistant.helpers.aiohttp_client import async_create_clientsession
+from homeassistant.helpers.aiohttp_client import SERVER_SOFTWARE
 from homeassistant.helpers.update_coordinator import (
     CoordinatorEntity,
     DataUpdateCoordinator,
+    UpdateFailed,
 )
 from homeassistant.config_entries import ConfigEntry, SOURCE_IMPORT, current_entry
 from homeassistant.const import (
@@ -34,21 +48,33 @@ from homeassistant.const import (
     CONF_SCAN_INTERVAL,
     CONF_TIMEOUT,
     CONF_USERNAME,
+    EVENT_HOMEASSISTANT_CLOSE,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
 from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.storage import Store
 from homeassistant.helpers.typing import ConfigType
+from homeassistant.util.dt import utcnow
+from homeassistant.util.ssl import get_default_context
 
 import homeassistant.helpers.config_validation as cv
 
 
 from custom_components.mosoblgaz.api import (
+    DATA_FEATURE_DEVICES_EOL,
+    DATA_FEATURE_INVOICES,
+    DATA_FEATURE_METERS,
+    X_SYSTEM_AUTH_TOKEN_CACHE,
     AuthenticationFailedException,
-    CaptchaResponse,
     Contract,
     MosoblgazAPI,
     MosoblgazException,
     PartialOfflineException,
+    ResponseProfiler,
+    WireTracer,
+    get_blackout_end,
+    mask_secret,
 )
 from custom_components.mosoblgaz.const import *
 
@@ -56,6 +82,20 @@ _LOGGER = logging.getLogger(__name__)
 
 _TConfigsList = TypeVar("_TConfigsList", bound=Sequence[Mapping[str, Any]])
 
+_BLACKOUT_MARGIN: Final = timedelta(minutes=1)
+
+_TOKEN_REFRESH_MARGIN: Final = timedelta(minutes=5)
+_TOKEN_REFRESH_MARGIN_RATIO: Final = 0.2
+_MIN_TOKEN_REFRESH_DELAY: Final = timedelta(minutes=1)
+
+_DEGRADED_UPDATE_INTERVAL: Final = timedelta(minutes=5)
+
+_DATA_FEATURES_BY_UNIQUE_ID_PREFIX: Final = {
+    "meter_": DATA_FEATURE_METERS,
+    "device_eol_": DATA_FEATURE_DEVICES_EOL,
+    "invoice_": DATA_FEATURE_INVOICES,
+}
+
 
 def _unique_username_validator(configs: _TConfigsList) -> _TConfigsList:
     existing_usernames = set()
@@ -119,9 +159,20 @@ class MosoblgazUpdateCoordinator(DataUpdateCoordinator[dict[str, Contract]]):
         api: MosoblgazAPI,
         update_interval: timedelta | None = None,
         logger: logging.Logger | logging.LoggerAdapter = _LOGGER,
+        full_update_interval: timedelta | None = None,
+        session_store: Store[dict[str, Any]] | None = None,
     ) -> None:
         self.api = api
+        self.session_store = session_store
+        self._saved_session: dict[str, Any] | None = None
+        self._unsub_token_refresh: CALLBACK_TYPE | None = None
+        self.full_update_interval = full_update_interval
+        self._last_full_update: datetime | None = None
+        self._base_update_interval = update_interval
         super().__init__(hass, logger, name=DOMAIN, update_interval=update_interval)
+        self.loaded_options: dict[str, Any] = (
+            {} if self.config_entry is None else dict(self.config_entry.options)
+        )
 
     @cached_property
     def should_invert_invoices(self) -> bool:
@@ -130,7 +181,76 @@ class MosoblgazUpdateCoordinator(DataUpdateCoordinator[dict[str, Contract]]):
         except (AttributeError, KeyError):
             return DEFAULT_INVERT_INVOICES
 
+    def _is_full_update_due(self) -> bool:
+        if self._last_full_update is None or self.full_update_interval is None:
+            return True
+        # Allow for scheduling jitter of the balance updates
+        slack = (self._base_update_interval or timedelta()) / 2
+        return utcnow() - self._last_full_update >= self.full_update_interval - slack
+
+    async def async_request_full_refresh(self) -> None:
+        """Request refresh which includes full contract data."""
+        self._last_full_update = None
+        await self.async_request_refresh()
+
+    async def _async_fetch_contracts(self) -> dict[str, Contract]:
+        with_data = self._is_full_update_due()
+        contracts = await async_run_with_exceptions(
+            self.api.fetch_contracts(with_data=with_data)
+        )
+        if not with_data and any(c.needs_data for c in contracts.values()):
+            self.logger.debug("New contracts or devices found, performing full update")
+            with_data = True
+            contracts = await async_run_with_exceptions(
+                self.api.fetch_contracts(with_data=True)
+            )
+        if with_data:
+            self._last_full_update = utcnow()
+        return contracts
+
+    def _adjust_update_interval(self, update_failed: bool = False) -> None:
+        """Move next scheduled update out of the maintenance window."""
+        if (update_interval := self._base_update_interval) is None:
+            return
+        now = utcnow()
+        blackout_end = get_blackout_end(now) or get_blackout_end(now + update_interval)
+        if blackout_end is not None:
+            update_interval = blackout_end - now + _BLACKOUT_MARGIN
+        elif update_failed or self.api.circuit_breaker.is_open:
+            # Probe the backend as soon as suspended requests are let through
+            update_interval = min(
+                update_interval,
+                timedelta(seconds=self.api.circuit_breaker.recovery_timeout),
+            )
+        elif self.api.is_degraded():
+            # Poll more often to pick up recovery of the service
+            update_interval = min(update_interval, _DEGRADED_UPDATE_INTERVAL)
+        self.update_interval = update_interval
+
     async def _async_update_data(self) -> dict[str, Contract]:
+        update_failed = False
+        try:
+            if (blackout_end := get_blackout_end()) is not None:
+                # Requests fail during maintenance and trigger re-authentication
+                if self.data is None:
+                    raise UpdateFailed("Maintenance window is in progress")
+                self.logger.info(
+                    "Skipping update until maintenance window ends at %s",
+                    blackout_end,
+                )
+                return self.data
+            return await self._async_update_contracts()
+        except Exception:
+            update_failed = True
+            raise
+        finally:
+            self._adjust_update_interval(update_failed)
+
+    async def _async_update_contracts(self) -> dict[str, Contract]:
+        if self.api.is_degraded():
+            # Fetch full data once service recovers
+            self._last_full_update = None
+
         if self.api.graphql_token:
             # Fetch X-SYSTEM-Auth token here if not present
             if not self.api.x_system_auth_token:
@@ -138,34 +258,126 @@ class MosoblgazUpdateCoordinator(DataUpdateCoordinator[dict[str, Contract]]):
 
             # Attempt to authenticate with existing GraphQL token
             try:
-                contracts = await async_run_with_exceptions(
-                    self.api.fetch_contracts(with_data=True)
-                )
+                contracts = await self._async_fetch_contracts()
             except ConfigEntryAuthFailed:
                 self.logger.info("GraphQL token may be obsolete, ignoring")
+                self.api.invalidate_graphql_token()
+
+        if not self.api.graphql_token and self.api.has_session_cookies:
+            # Attempt to retrieve GraphQL token with restored session
+            try:
+                await async_run_with_exceptions(self.api.refresh_graphql_token())
+                contracts = await self._async_fetch_contracts()
+            except ConfigEntryAuthFailed:
+                self.logger.info("Session cookies may be obsolete, ignoring")
                 self.api.graphql_token = None
+                self.api.clear_cookies()
 
         if not self.api.graphql_token:
-            # Refresh all tokens; also check if CAPTCHA is required now
-            temporary_token = await self.api.fetch_temporary_token()
-            if isinstance(temporary_token, CaptchaResponse):
-                raise ConfigEntryAuthFailed("CAPTCHA input required")
-            await async_run_with_exceptions(self.api.authenticate(temporary_token))
-            contracts = await async_run_with_exceptions(
-                self.api.fetch_contracts(with_data=True)
-            )
+            # Avoid logging in while service is known to be offline
+            await async_run_with_exceptions(self.api.check_service_status())
+
+            # Refresh all tokens; fails if CAPTCHA is required now
+            await async_run_with_exceptions(self.api.login())
+            contracts = await self._async_fetch_contracts()
 
+        self._async_save_session()
+        self._async_schedule_token_refresh()
+
+        return contracts
+
+    @callback
+    def _async_save_session(self) -> None:
+        """Persist GraphQL token and session cookies when they change."""
         if self.config_entry.data.get(CONF_GRAPHQL_TOKEN) != self.api.graphql_token:
             merge_data = dict(self.config_entry.data)
             merge_data[CONF_GRAPHQL_TOKEN] = self.api.graphql_token
             self.logger.debug(
-                "GraphQL token has been updated: %s", self.api.graphql_token
+                "GraphQL token has been updated: %s",
+                mask_secret(self.api.graphql_token),
             )
             self.hass.config_entries.async_update_entry(
                 self.config_entry, data=merge_data
             )
 
-        return contracts
+        if self.session_store is None:
+            return
+        session = {
+            "cookies": self.api.export_cookies(),
+            "graphql_token_issued_at": self.api.graphql_token_issued_at,
+            "graphql_token_lifetime": self.api.graphql_token_lifetime,
+        }
+        if session == self._saved_session:
+            return
+        self._saved_session = session
+        self.session_store.async_delay_save(lambda: session, 10)
+
+    @callback
+    def _async_schedule_token_refresh(self) -> None:
+        """Schedule token refresh ahead of its expected expiration."""
+        self.async_cancel_token_refresh()
+        if (expires_at := self.api.graphql_token_expires_at) is None:
+            return
+
+        # Refresh short-lived tokens proportionally closer to expiration
+        margin = _TOKEN_REFRESH_MARGIN.total_seconds()
+        if (issued_at := self.api.graphql_token_issued_at) is not None:
+            margin = min(margin, (expires_at - issued_at) * _TOKEN_REFRESH_MARGIN_RATIO)
+
+        # Never refresh back to back, even with expired or very short tokens
+        delay = max(
+            expires_at - time.time() - margin,
+            _MIN_TOKEN_REFRESH_DELAY.total_seconds(),
+        )
+        self.logger.debug("Scheduling token refresh in %.0f seconds", delay)
+        self._unsub_token_refresh = async_call_later(
+            self.hass, delay, self._async_refresh_tokens
+        )
+
+    @callback
+    def async_cancel_token_refresh(self) -> None:
+        if self._unsub_token_refresh is not None:
+            self._unsub_token_refresh()
+            self._unsub_token_refresh = None
+
+    @callback
+    def async_call_after_blackout(
+        self,
+        blackout_end: datetime,
+        action: Callable[[datetime], Coroutine[Any, Any, None] | None],
+    ) -> CALLBACK_TYPE:
+        """Schedule action to run once the maintenance window is over."""
+        return async_call_later(
+            self.hass, blackout_end - utcnow() + _BLACKOUT_MARGIN, action
+        )
+
+    async def _async_refresh_tokens(self, _now: datetime) -> None:
+        self._unsub_token_refresh = None
+        if (blackout_end := get_blackout_end()) is not None:
+            # Do not authenticate during the maintenance window
+            self.logger.debug(
+                "Deferring token refresh until maintenance window ends at %s",
+                blackout_end,
+            )
+            self._unsub_token_refresh = self.async_call_after_blackout(
+                blackout_end, self._async_refresh_tokens
+            )
+            return
+
+        previous_token = self.api.graphql_token
+        try:
+            await self.api.refresh_tokens()
+        except MosoblgazException as exc:
+            # Next update will authenticate inline
+            self.logger.warning("Could not refresh tokens in background: %s", exc)
+            return
+
+        self._async_save_session()
+        if self.api.graphql_token == previous_token:
+            self.logger.debug("GraphQL token has not changed after refresh")
+            return
+        self.logger.debug("Tokens refreshed ahead of expiration")
+        self._async_schedule_token_refresh()
 
 
 class MosoblgazCoordinatorEntity(CoordinatorEntity[MosoblgazUpdateCoordinator]):
@@ -207,6 +419,8 @@ async def async_setup(hass: HomeAssistant, config: ConfigType):
     """Set up the Mosoblgaz component."""
     hass.data[DOMAIN] = {}
 
+    await _async_setup_x_system_auth_cache(hass)
+
     if not (domain_config := config.get(DOMAIN)):
         return True
 
@@ -270,6 +484,87 @@ async def async_setup(hass: HomeAssistant, config: ConfigType):
     return True
 
 
+async def _async_setup_x_system_auth_cache(hass: HomeAssistant) -> None:
+    """Restore shared X-SYSTEM-AUTH token cache and persist its updates."""
+    store: Store[dict[str, str | None]] = Store(
+        hass, STORAGE_VERSION, STORAGE_KEY_X_SYSTEM_AUTH
+    )
+    if stored_data := await store.async_load():
+        X_SYSTEM_AUTH_TOKEN_CACHE.load(stored_data)
+        _LOGGER.debug(
+            "Restored X-SYSTEM-AUTH token cache for %s",
+            X_SYSTEM_AUTH_TOKEN_CACHE.main_js_location,
+        )
+
+    X_SYSTEM_AUTH_TOKEN_CACHE.on_update = lambda cache: store.async_delay_save(
+        cache.as_dict, 10
+    )
+
+
+@callback
+def async_get_connector(hass: HomeAssistant) -> TCPConnector:
+    """Get connector shared by sessions of all config entries."""
+    if (connector := hass.data.get(DATA_CONNECTOR)) is not None:
+        return connector
+
+    connector = TCPConnector(
+        limit_per_host=CONNECTOR_LIMIT_PER_HOST,
+        keepalive_timeout=CONNECTOR_KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=CONNECTOR_DNS_CACHE_TTL,
+        ssl=get_default_context(),
+    )
+    hass.data[DATA_CONNECTOR] = connector
+
+    async def _async_close_connector(event: Event) -> None:
+        await connector.close()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, _async_close_connector)
+    return connector
+
+
+@callback
+def async_create_mosoblgaz_session(
+    hass: HomeAssistant, request_timeout: int | float
+) -> ClientSession:
+    """Create session with isolated cookie jar over the shared connector."""
+    return ClientSession(
+        connector=async_get_connector(hass),
+        connector_owner=False,
+        cookie_jar=CookieJar(),
+        timeout=ClientTimeout(total=request_timeout),
+        headers={"User-Agent": SERVER_SOFTWARE},
+    )
+
+
+def async_get_data_features(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> frozenset[str] | None:
+    """Collect data features required by entities of config entry.
+
+    A feature is dropped only when entities of its kind exist and all of
+    them are disabled; otherwise entities created for newly appeared
+    devices or invoices would receive pruned data. Returns None when no
+    entities are registered yet, so that everything gets fetched."""
+    registry_entries = entity_registry.async_entries_for_config_entry(
+        entity_registry.async_get(hass), entry.entry_id
+    )
+    if not registry_entries:
+        return None
+
+    registered_features = set()
+    enabled_features = set()
+    for registry_entry in registry_entries:
+        for prefix, feature in _DATA_FEATURES_BY_UNIQUE_ID_PREFIX.items():
+            if registry_entry.unique_id.startswith(prefix):
+                registered_features.add(feature)
+                if registry_entry.disabled_by is None:
+                    enabled_features.add(feature)
+                break
+
+    disabled_features = registered_features - enabled_features
+    return frozenset(_DATA_FEATURES_BY_UNIQUE_ID_PREFIX.values()) - disabled_features
+
+
 async def async_run_with_exceptions(coro: Awaitable):
     """Execute coroutine with Home Assistant exceptions."""
     try:
@@ -295,10 +590,9 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     if entry.options and CONF_TIMEOUT in entry.options:
         request_timeout = entry.options[CONF_TIMEOUT] or request_timeout
 
-    # Instantiate a separate client session
-    session = async_create_clientsession(
-        hass, timeout=ClientTimeout(total=request_timeout)
-    )
+    # Instantiate a separate client session with its own cookie jar
+    session = async_create_mosoblgaz_session(hass, request_timeout)
+    entry.async_on_unload(session.close)
 
     # Instantiate api object
     api = MosoblgazAPI(
@@ -306,6 +600,29 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
         password=entry.data[CONF_PASSWORD],
         session=session,
         graphql_token=entry.data.get(CONF_GRAPHQL_TOKEN),
+        data_features=async_get_data_features(hass, entry),
+        contracts_chunk_size=entry.options.get(
+            CONF_CONTRACTS_CHUNK_SIZE, DEFAULT_CONTRACTS_CHUNK_SIZE
+        ),
+        max_concurrent_chunks=entry.options.get(
+            CONF_MAX_CONCURRENT_CHUNKS, DEFAULT_MAX_CONCURRENT_CHUNKS
+        ),
+        persisted_queries=entry.options.get(
+            CONF_PERSISTED_QUERIES, DEFAULT_PERSISTED_QUERIES
+        ),
+        response_profiler=(
+            ResponseProfiler()
+            if entry.options.get(CONF_PROFILE_RESPONSES, DEFAULT_PROFILE_RESPONSES)
+            else None
+        ),
+        wire_tracer=WireTracer(
+            sample_rate=entry.options.get(
+                CONF_WIRE_TRACE_SAMPLE_RATE, DEFAULT_WIRE_TRACE_SAMPLE_RATE
+            ),
+            buffer_size=entry.options.get(
+                CONF_WIRE_TRACE_BUFFER_SIZE, DEFAULT_WIRE_TRACE_BUFFER_SIZE
+            ),
+        ),
     )
 
     # Load scheduling for updates
@@ -315,9 +632,42 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     if not isinstance(update_interval, timedelta):
         update_interval = timedelta(seconds=update_interval)
 
+    # Balance-only updates are performed in between full updates
+    balance_update_interval: int | float | timedelta = DEFAULT_BALANCE_SCAN_INTERVAL
+    if entry.options and CONF_BALANCE_SCAN_INTERVAL in entry.options:
+        balance_update_interval = entry.options[CONF_BALANCE_SCAN_INTERVAL] or 0
+    if not isinstance(balance_update_interval, timedelta):
+        balance_update_interval = timedelta(seconds=balance_update_interval)
+
+    # Restore authenticated session cookies and token timings
+    session_store: Store[dict[str, Any]] = Store(
+        hass,
+        STORAGE_VERSION,
+        STORAGE_KEY_SESSION.format(entry.entry_id),
+        private=True,
+    )
+    if stored_session := await session_store.async_load():
+        api.import_cookies(stored_session.get("cookies") or ())
+        api.graphql_token_lifetime = stored_session.get("graphql_token_lifetime")
+        if api.graphql_token and stored_session.get("graphql_token_issued_at"):
+            api.graphql_token_issued_at = stored_session["graphql_token_issued_at"]
+        logger.debug("Restored session cookies")
+
     # Setup coordinator
-    coordinator = MosoblgazUpdateCoordinator(hass, api, update_interval, logger)
+    coordinator = MosoblgazUpdateCoordinator(
+        hass,
+        api,
+        (
+            balance_update_interval
+            if timedelta() < balance_update_interval < update_interval
+            else update_interval
+        ),
+        logger,
+        full_update_interval=update_interval,
+        session_store=session_store,
+    )
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    entry.async_on_unload(coordinator.async_cancel_token_refresh)
 
     # Refresh configuration entry to set initial data
     logger.debug("Performing initial refresh on the coordinator")
@@ -341,6 +691,12 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
 async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
     """React to options update"""
+    coordinator: MosoblgazUpdateCoordinator | None = hass.data[DOMAIN].get(
+        entry.entry_id
+    )
+    if coordinator is not None and coordinator.loaded_options == entry.options:
+        # Data updates (such as GraphQL token rotation) do not require reload
+        return
     ConfigEntryLoggerAdapter(config_entry=entry).debug("Reloading configuration entry")
     await hass.config_entries.async_reload(entry.entry_id)
 
@@ -362,6 +718,13 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return True
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of config entry."""
+    await Store(
+        hass, STORAGE_VERSION, STORAGE_KEY_SESSION.format(entry.entry_id)
+    ).async_remove()
+
+
 async def async_migrate_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     _LOGGER.debug(
         f'Migrating entry "{entry.entry_id}" '
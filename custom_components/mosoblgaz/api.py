@@ -1,18 +1,55 @@
 """Simplistic implementation of interaction with Mosoblgaz API"""
 
 import asyncio
+import base64
+from collections import deque
+from contextlib import asynccontextmanager
 from enum import IntEnum, nonmember
+import heapq
+import itertools
 import json
 import logging
+import random
 import re
-from datetime import date, datetime, timedelta
+import time
+from datetime import date, datetime, timedelta, tzinfo
+from functools import lru_cache
+import hashlib
+from http.cookies import CookieError, SimpleCookie
 from types import MappingProxyType
-from typing import Any, Mapping, NamedTuple
+from urllib.parse import urlsplit
+from typing import (
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Collection,
+    Hashable,
+    Iterable,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    TypeVar,
+)
 
 import aiohttp
 from dateutil.tz import gettz
+import yarl
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
 
 _LOGGER = logging.getLogger(__name__)
+_WIRE_LOGGER = logging.getLogger(__name__ + ".wire")
+
+_T = TypeVar("_T")
 
 HistoryEntryDataType = dict[str, str | dict[str, int]]
 DeviceDataType = dict[str, Any]
@@ -23,25 +60,457 @@ INVOICE_GROUP_VDGO = "vdgo"
 INVOICE_GROUP_TECH = "tech"
 INVOICE_GROUPS = frozenset((INVOICE_GROUP_GAS, INVOICE_GROUP_VDGO, INVOICE_GROUP_TECH))
 
+DATA_FEATURE_METERS = "meters"
+DATA_FEATURE_DEVICES_EOL = "devices_eol"
+DATA_FEATURE_INVOICES = "invoices"
+DATA_FEATURES = frozenset(
+    (DATA_FEATURE_METERS, DATA_FEATURE_DEVICES_EOL, DATA_FEATURE_INVOICES)
+)
+
+SERVICE_FEATURE_DATA = "data"
+SERVICE_FEATURE_PUSH = "push"
+SERVICE_FEATURE_STATUSES: Mapping[str, dict[str, bool | str]] = MappingProxyType(
+    {
+        SERVICE_FEATURE_DATA: {"coffee_break": False},
+        SERVICE_FEATURE_PUSH: {
+            "coffee_break": False,
+            "saupg_values_coffee_break": False,
+        },
+    }
+)
+
+
+@lru_cache(maxsize=None)
+def get_timezone(name: str) -> tzinfo | None:
+    return gettz(name)
+
 
 def convert_date_dict(date_dict: dict[str, str | int]) -> datetime:
     return datetime.fromisoformat(date_dict["date"]).replace(
-        tzinfo=gettz(date_dict["timezone"])
+        tzinfo=get_timezone(date_dict["timezone"])
     )
 
 
-MOSCOW_TIMEZONE = gettz("Europe/Moscow")
+def parse_date(value: str | None) -> date | None:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+def parse_date_dict(value: dict[str, str | int] | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        return convert_date_dict(value)
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def parse_reading(value: Any) -> int:
+    """Parse meter reading, which may be sent as a decimal string"""
+    try:
+        return int(float(value))
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"malformed meter reading: {value!r}")
+
+
+MOSCOW_TIMEZONE = get_timezone("Europe/Moscow")
+
+X_SYSTEM_AUTH_TOKEN_PATTERN = re.compile(
+    rb'[\'"]X-SYSTEM-AUTH-TOKEN[\'"]\s*:\s*[\'"]([^\'"]+)[\'"]'
+)
+
+
+def get_token_expiry(token: str) -> float | None:
+    """Extract expiration timestamp from JWT-like token, if embedded"""
+    try:
+        payload = token.split(".")[1]
+        claims = json.loads(
+            base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4))
+        )
+        return float(claims["exp"])
+    except (IndexError, ValueError, TypeError, KeyError):
+        return None
+
+
+PERSISTED_QUERY_NOT_FOUND = "PersistedQueryNotFound"
+PERSISTED_QUERY_NOT_SUPPORTED = "PersistedQueryNotSupported"
+_PERSISTED_QUERY_ERROR_CODES = {
+    "PERSISTED_QUERY_NOT_FOUND": PERSISTED_QUERY_NOT_FOUND,
+    "PERSISTED_QUERY_NOT_SUPPORTED": PERSISTED_QUERY_NOT_SUPPORTED,
+}
+
+
+@lru_cache(maxsize=128)
+def get_query_hash(query: str) -> str:
+    """Get persisted query hash of compiled GraphQL document"""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
+
+
+def get_persisted_query_error(result: "OperationResult") -> str | None:
+    """Get persisted query error reported within operation result, if any"""
+    for error in result.errors or ():
+        if not isinstance(error, dict):
+            continue
+        if (message := error.get("message")) in (
+            PERSISTED_QUERY_NOT_FOUND,
+            PERSISTED_QUERY_NOT_SUPPORTED,
+        ):
+            return message
+        code = (error.get("extensions") or {}).get("code")
+        if code in _PERSISTED_QUERY_ERROR_CODES:
+            return _PERSISTED_QUERY_ERROR_CODES[code]
+    return None
+
+
+async def search_stream(
+    stream: aiohttp.StreamReader,
+    pattern: re.Pattern[bytes],
+    chunk_size: int = 65536,
+    overlap: int = 1024,
+) -> bytes | None:
+    """Search stream for the first pattern match without reading it fully.
+
+    The last `overlap` bytes of every chunk are kept for the next search, so
+    matches no longer than that are found across chunk boundaries."""
+    buffer = b""
+    async for chunk in stream.iter_chunked(chunk_size):
+        buffer = buffer[-overlap:] + chunk
+        if (results := pattern.search(buffer)) is not None:
+            return results[1]
+    return None
+
+
+class JsonCodec:
+    """Standard library JSON codec for GraphQL payloads"""
+
+    name = "json"
+    decode_error: type[Exception] = json.JSONDecodeError
+
+    @staticmethod
+    def loads(data: bytes | str) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(value: Any) -> bytes:
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class OrjsonCodec(JsonCodec):
+    name = "orjson"
+
+    if orjson is not None:
+        decode_error = orjson.JSONDecodeError
+        loads = staticmethod(orjson.loads)
+        dumps = staticmethod(orjson.dumps)
+
+
+class MsgspecCodec(JsonCodec):
+    name = "msgspec"
+
+    if msgspec is not None:
+        decode_error = msgspec.DecodeError
+        loads = staticmethod(msgspec.json.decode)
+        dumps = staticmethod(msgspec.json.encode)
+
+
+if orjson is not None:
+    DEFAULT_JSON_CODEC: type[JsonCodec] = OrjsonCodec
+elif msgspec is not None:
+    DEFAULT_JSON_CODEC = MsgspecCodec
+else:
+    DEFAULT_JSON_CODEC = JsonCodec
+
+
+REDACTED = "**REDACTED**"
+SECRET_KEYS = frozenset(
+    (
+        "_csrf_token",
+        "cookie",
+        "mog-captcha-response",
+        "mog_login[captcha]",
+        "mog_login[password]",
+        "password",
+        "set-cookie",
+        "token",
+        "x-system-auth",
+    )
+)
+
+
+def mask_secret(value: str | None) -> str:
+    """Mask secret for logging, keeping a short prefix for correlation"""
+    if not value:
+        return repr(value)
+    return "%s...(%d)" % (value[:4], len(value))
+
+
+class _TraceTruncated(Exception):
+    pass
+
+
+class _TraceRecord:
+    """Trace record data formatted only when the record is emitted"""
+
+    __slots__ = ("tracer", "data", "_text")
+
+    def __init__(self, tracer: "WireTracer", data: Any) -> None:
+        self.tracer = tracer
+        self.data = data
+        self._text: str | None = None
+
+    def __str__(self) -> str:
+        if self._text is None:
+            self._text = self.tracer.format(self.data)
+        return self._text
+
+
+class WireTracer:
+    """Trace data exchanged with the backend.
+
+    Data is formatted lazily, with secrets redacted by key and output capped
+    at `max_record_size` characters, so that large documents are never fully
+    stringified. Records may be sampled, and optionally retained in a ring
+    buffer of `buffer_size` records for diagnostics."""
+
+    def __init__(
+        self,
+        logger: logging.Logger = _WIRE_LOGGER,
+        max_record_size: int = 4096,
+        sample_rate: float = 1.0,
+        buffer_size: int = 0,
+        secret_keys: Collection[str] = SECRET_KEYS,
+    ) -> None:
+        self.logger = logger
+        self.max_record_size = max_record_size
+        self.sample_rate = sample_rate
+        self.secret_keys = frozenset(key.lower() for key in secret_keys)
+        self.buffer: deque[tuple[float, str, str]] | None = (
+            deque(maxlen=buffer_size) if buffer_size > 0 else None
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.buffer is not None or self.logger.isEnabledFor(logging.DEBUG)
+
+    def trace(self, event: str, data: Any) -> None:
+        if not self.enabled:
+            return
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        record = _TraceRecord(self, data)
+        self.logger.debug("%s: %s", event, record)
+        if self.buffer is not None:
+            self.buffer.append((time.time(), event, str(record)))
+
+    def format(self, data: Any) -> str:
+        parts: list[str] = []
+        remaining = self.max_record_size
+        secret_keys = self.secret_keys
+
+        def _emit(text: str) -> None:
+            nonlocal remaining
+            parts.append(text)
+            remaining -= len(text)
+            if remaining <= 0:
+                raise _TraceTruncated
+
+        def _walk(value: Any) -> None:
+            if isinstance(value, Mapping):
+                _emit("{")
+                for i, (key, item) in enumerate(value.items()):
+                    _emit((", " if i else "") + repr(key) + ": ")
+                    if isinstance(key, str) and key.lower() in secret_keys:
+                        _emit(repr(REDACTED))
+                    else:
+                        _walk(item)
+                _emit("}")
+            elif isinstance(value, (list, tuple)):
+                _emit("[")
+                for i, item in enumerate(value):
+                    if i:
+                        _emit(", ")
+                    _walk(item)
+                _emit("]")
+            elif isinstance(value, (bytes, bytearray)):
+                _emit(repr(bytes(value[: remaining + 1]).decode(errors="replace")))
+            elif isinstance(value, str):
+                _emit(repr(value[: remaining + 1]))
+            else:
+                _emit(repr(value))
+
+        try:
+            _walk(data)
+        except _TraceTruncated:
+            return "".join(parts)[: self.max_record_size] + "... (truncated)"
+        return "".join(parts)
+
+
+class TemplateProfile:
+    """Aggregated response statistics of a single query template"""
+
+    __slots__ = (
+        "responses",
+        "bytes",
+        "last_bytes",
+        "peak_bytes",
+        "decode_time",
+        "fields",
+    )
+
+    def __init__(self) -> None:
+        self.responses = 0
+        self.bytes = 0
+        self.last_bytes = 0
+        self.peak_bytes = 0
+        self.decode_time = 0.0
+        # Field path -> [bytes, decode time]
+        self.fields: dict[str, list[float]] = {}
+
+    def as_dict(self) -> dict[str, Any]:
+        total_bytes = self.bytes or 1
+        return {
+            "responses": self.responses,
+            "bytes": self.bytes,
+            "average_bytes": self.bytes // (self.responses or 1),
+            "last_bytes": self.last_bytes,
+            "peak_bytes": self.peak_bytes,
+            "decode_time": round(self.decode_time, 6),
+            "fields": {
+                path: {
+                    "bytes": int(field_bytes),
+                    "share": round(field_bytes / total_bytes, 4),
+                    "decode_time": round(field_decode_time, 6),
+                }
+                for path, (field_bytes, field_decode_time) in sorted(
+                    self.fields.items(), key=lambda x: x[1][0], reverse=True
+                )
+            },
+        }
+
+
+class ResponseProfiler:
+    """Attribute response bytes and decode time to field paths.
+
+    Statistics are aggregated per query template (operation name) for the
+    account of the API object. Sizes are measured by compact serialization
+    of decoded data; decode time of a batch can not be measured per field,
+    hence it is attributed proportionally to sizes. List items and contract
+    aliases are collapsed into single paths, and fields nested deeper than
+    `max_depth` are accounted for in their ancestors only."""
 
+    ALIAS_PATTERN = re.compile(r"c\d+")
 
-def today_blackout(
-    check: datetime | None = None,
-) -> tuple[datetime, datetime] | bool:
-    today = datetime.now(tz=MOSCOW_TIMEZONE)
-    blackout_start = today.replace(hour=5, minute=30, second=0)
-    blackout_end = today.replace(hour=6, minute=0, second=0)
+    def __init__(self, max_depth: int = 6) -> None:
+        self.max_depth = max_depth
+        self.templates: dict[str, TemplateProfile] = {}
+
+    def record(
+        self,
+        payload: Sequence[Mapping[str, Any]],
+        decoded: Sequence[Any],
+        decode_time: float,
+        dumps: Callable[[Any], bytes],
+    ) -> None:
+        measured = []
+        for operation, item in zip(payload, decoded):
+            fields: dict[str, int] = {}
+            size = self._measure(item, "", 0, fields, dumps)
+            measured.append(
+                (operation.get("operationName") or "anonymous", size, fields)
+            )
+
+        total_size = sum(size for _, size, _ in measured) or 1
+        for template, size, fields in measured:
+            if (profile := self.templates.get(template)) is None:
+                profile = self.templates[template] = TemplateProfile()
+            profile.responses += 1
+            profile.bytes += size
+            profile.last_bytes = size
+            profile.peak_bytes = max(profile.peak_bytes, size)
+            profile.decode_time += decode_time * size / total_size
+            for path, field_size in fields.items():
+                if (field := profile.fields.get(path)) is None:
+                    field = profile.fields[path] = [0, 0.0]
+                field[0] += field_size
+                field[1] += decode_time * field_size / total_size
+
+    def _measure(
+        self,
+        value: Any,
+        path: str,
+        depth: int,
+        fields: dict[str, int],
+        dumps: Callable[[Any], bytes],
+    ) -> int:
+        if isinstance(value, dict):
+            size = 1 + max(len(value), 1)
+            for key, item in value.items():
+                if self.ALIAS_PATTERN.fullmatch(key):
+                    key = "c*"
+                size += (
+                    len(key)
+                    + 3
+                    + self._measure(
+                        item,
+                        path + "." + key if path else key,
+                        depth + 1,
+                        fields,
+                        dumps,
+                    )
+                )
+        elif isinstance(value, list):
+            size = 1 + max(len(value), 1)
+            for item in value:
+                size += self._measure(item, path + "[]", depth, fields, dumps)
+        else:
+            size = len(dumps(value))
+        if path and depth <= self.max_depth:
+            fields[path] = fields.get(path, 0) + size
+        return size
+
+    def report(self) -> dict[str, dict[str, Any]]:
+        return {
+            template: profile.as_dict()
+            for template, profile in sorted(
+                self.templates.items(), key=lambda x: x[1].bytes, reverse=True
+            )
+        }
+
+    def reset(self) -> None:
+        self.templates.clear()
+
+
+def _create_background_task(coro: Awaitable[_T]) -> asyncio.Task[_T]:
+    """Create task which does not warn about unretrieved exceptions"""
+    task = asyncio.ensure_future(coro)
+    task.add_done_callback(lambda x: x.cancelled() or x.exception())
+    return task
+
+
+def _is_task_reusable(task: asyncio.Future | None) -> bool:
+    """Check whether task is either pending or finished successfully"""
+    if task is None:
+        return False
+    if not task.done():
+        return True
+    return not task.cancelled() and task.exception() is None
+
+
+def get_blackout_end(check: datetime | None = None) -> datetime | None:
+    """Get end of the maintenance blackout window containing given moment"""
     if check is None:
-        return blackout_start, blackout_end
-    return blackout_start <= check <= blackout_end
+        check = datetime.now(tz=MOSCOW_TIMEZONE)
+    else:
+        check = check.astimezone(MOSCOW_TIMEZONE)
+    blackout_start = check.replace(hour=5, minute=30, second=0, microsecond=0)
+    blackout_end = check.replace(hour=6, minute=0, second=0, microsecond=0)
+    if blackout_start <= check <= blackout_end:
+        return blackout_end
+    return None
 
 
 class ClassCodes(IntEnum):
@@ -86,6 +555,9 @@ class Queries:
                         + ", ".join(["%s: $%s" % v for v in sub_query[0][1].items()])
                         + ")"
                     )
+                    if len(sub_query[0]) > 2:
+                        # Prepend alias to the section
+                        section_name = sub_query[0][2] + ": " + section_name
                 else:
                     section_name = sub_query[0]
 
@@ -102,6 +574,17 @@ class Queries:
         buffer += "\n" + indent_str * (indent_level - 1) + "}"
         return buffer
 
+    @classmethod
+    def compile_template(cls, template_format: tuple | list) -> str:
+        if isinstance(template_format, tuple):
+            return (
+                "("
+                + ", ".join(["$%s: %s" % v for v in template_format[0].items()])
+                + ")"
+                + cls.compile_sub_query(template_format[1])
+            )
+        return cls.compile_sub_query(template_format)
+
     @classmethod
     def query(cls, template: str, use_name: bool | str = True) -> str:
         if not hasattr(cls, template):
@@ -117,21 +600,114 @@ class Queries:
             compiled_query = cls._compiled_queries[template]
 
         else:
-            template_format = getattr(cls, template)
-            if isinstance(template_format, tuple):
-                compiled_query = (
-                    "("
-                    + ", ".join(["$%s: %s" % v for v in template_format[0].items()])
-                    + ")"
-                    + cls.compile_sub_query(template_format[1])
-                )
-            else:
-                compiled_query = cls.compile_sub_query(template_format)
-
+            compiled_query = cls.compile_template(getattr(cls, template))
             cls._compiled_queries[template] = compiled_query
 
         return prefix + compiled_query
 
+    @classmethod
+    def contract_fields(cls, features: Collection[str] | None = None) -> list:
+        """Build contract selection with fields required by data features.
+
+        Full selection is returned when features are not specified."""
+        if features is None:
+            return cls.contractDevicesFields
+
+        device_fields = list(cls.contractDevicesBaseDeviceFields)
+        contract_fields = list(cls.contractDevicesBaseFields)
+        if DATA_FEATURE_METERS in features:
+            device_fields.append("DateNextCheck")
+            contract_fields.append(("metersHistory", ["number", "data"]))
+        if DATA_FEATURE_DEVICES_EOL in features:
+            device_fields.append("ExplEndDate")
+        if DATA_FEATURE_INVOICES in features:
+            contract_fields.append("calculationsAndPayments")
+        contract_fields.append(("contractData", ["number", ("Devices", device_fields)]))
+        return contract_fields
+
+    @classmethod
+    def contract_devices(cls, features: Collection[str] | None = None) -> str:
+        """Build contractDevices query with fields required by data features."""
+        if features is None:
+            return cls.query("contractDevices")
+
+        features = frozenset(features)
+        cache_key = ("contractDevices", features)
+        if (compiled_query := cls._compiled_queries.get(cache_key)) is None:
+            compiled_query = cls.compile_template(
+                (
+                    cls.contractDevices[0],
+                    [
+                        (
+                            "me",
+                            [
+                                "id",
+                                (
+                                    ("contract", {"number": "number"}),
+                                    cls.contract_fields(features),
+                                ),
+                            ],
+                        )
+                    ],
+                )
+            )
+            cls._compiled_queries[cache_key] = compiled_query
+
+        return "query contractDevices " + compiled_query
+
+    @classmethod
+    def contracts_devices(
+        cls,
+        count: int,
+        features: Collection[str] | None = None,
+        type_name: str | None = None,
+    ) -> str:
+        """Build query fetching multiple contracts within one operation.
+
+        Contract numbers are passed as `$n0`..`$nK` variables, and
+        contracts are selected under `c0`..`cK` aliases respectively.
+        When contract type name is known, the selection is shared by the
+        aliases through a fragment instead of being repeated for each."""
+        if features is not None:
+            features = frozenset(features)
+        cache_key = ("contractsDevices", count, features, type_name)
+        if (compiled_query := cls._compiled_queries.get(cache_key)) is None:
+            contract_fields = cls.contract_fields(features)
+            if type_name is not None:
+                fragment = cls.compile_sub_query(
+                    contract_fields, "fragment ContractFields on " + type_name
+                )
+                contract_fields = ["...ContractFields"]
+            compiled_query = cls.compile_template(
+                (
+                    {"n%d" % i: "String!" for i in range(count)},
+                    [
+                        (
+                            "me",
+                            [
+                                "id",
+                                *(
+                                    (
+                                        ("contract", {"number": "n%d" % i}, "c%d" % i),
+                                        contract_fields,
+                                    )
+                                    for i in range(count)
+                                ),
+                            ],
+                        )
+                    ],
+                )
+            )
+            if type_name is not None:
+                compiled_query += "\n" + fragment
+            cls._compiled_queries[cache_key] = compiled_query
+
+        return "query contractsDevices " + compiled_query
+
+    @staticmethod
+    def contracts_devices_variables(contract_ids: Sequence[str]) -> dict[str, str]:
+        return {"n%d" % i: contract_id for i, contract_id in enumerate(contract_ids)}
+
     getInternalSystemStatuses = [("me", ["id"]), "internalSystemStatuses"]
     messagesCount = [
         (
@@ -183,6 +759,94 @@ class Queries:
             ],
         )
     ]
+    contractDevicesBaseFields = [
+        ("filial", ["id", "title"]),
+        "alias",
+        "address",
+        "name",
+        "number",
+        ("liveBalance", ["number", "liveBalance"]),
+    ]
+    contractDevicesBaseDeviceFields = [
+        "ID",
+        "ClassCode",
+        "ClassName",
+        "Model",
+        "ManfFirm",
+        "ManfNo",
+        "Status",
+        "Archived",
+    ]
+    contractDevicesFields = [
+        ("filial", ["id", "title"]),
+        "alias",
+        "address",
+        "calculationsAndPayments",
+        "name",
+        "number",
+        "vdgo",
+        "existsRealMeter",
+        (
+            "contractData",
+            [
+                # ("TO", ["number", ("Dogovors", ["Num", "Code"])]),
+                "number",
+                (
+                    "Nach",
+                    [
+                        "number",
+                        (
+                            "sch",
+                            [
+                                "number",
+                                (
+                                    "data",
+                                    ["Id", "Cost", "Dim"],
+                                ),
+                            ],
+                        ),
+                    ],
+                ),
+                (
+                    "Devices",
+                    [
+                        "ID",
+                        "ClassCode",
+                        "ClassName",
+                        "Model",
+                        "ManfFirm",
+                        "ManfDate",
+                        "Place",
+                        "DateNextCheck",
+                        "ManfNo",
+                        "Status",
+                        "IdDogovoraTOVDGO",
+                        "Archived",
+                        "BeginDateOff",
+                        "OffReason",
+                        "OffReasonId",
+                        "MeterType",
+                        "ExtraMeterType",
+                        "SmartHouse",
+                        "IsForeign",
+                        "HeatOutput",
+                        "ExplEndDate",
+                        "SealDate",
+                        "SchMountDate",
+                        "SealNum",
+                        "MeterMaxM3",
+                        "GodVvoda",
+                    ],
+                ),
+            ],
+        ),
+        (
+            "contractTODocuments",
+            [("contract", ["number"]), ("file", ["id"])],
+        ),
+        ("liveBalance", ["number", "liveBalance"]),
+        ("metersHistory", ["number", "data"]),
+    ]
     contractDevices = (
         {"number": "String!"},
         [
@@ -190,79 +854,7 @@ class Queries:
                 "me",
                 [
                     "id",
-                    (
-                        ("contract", {"number": "number"}),
-                        [
-                            ("filial", ["id", "title"]),
-                            "alias",
-                            "address",
-                            "calculationsAndPayments",
-                            "name",
-                            "number",
-                            "vdgo",
-                            "existsRealMeter",
-                            (
-                                "contractData",
-                                [
-                                    # ("TO", ["number", ("Dogovors", ["Num", "Code"])]),
-                                    "number",
-                                    (
-                                        "Nach",
-                                        [
-                                            "number",
-                                            (
-                                                "sch",
-                                                [
-                                                    "number",
-                                                    (
-                                                        "data",
-                                                        ["Id", "Cost", "Dim"],
-                                                    ),
-                                                ],
-                                            ),
-                                        ],
-                                    ),
-                                    (
-                                        "Devices",
-                                        [
-                                            "ID",
-                                            "ClassCode",
-                                            "ClassName",
-                                            "Model",
-                                            "ManfFirm",
-                                            "ManfDate",
-                                            "Place",
-                                            "DateNextCheck",
-                                            "ManfNo",
-                                            "Status",
-                                            "IdDogovoraTOVDGO",
-                                            "Archived",
-                                            "BeginDateOff",
-                                            "OffReason",
-                                            "OffReasonId",
-                                            "MeterType",
-                                            "ExtraMeterType",
-                                            "SmartHouse",
-                                            "IsForeign",
-                                            "HeatOutput",
-                                            "ExplEndDate",
-                                            "SealDate",
-                                            "SchMountDate",
-                                            "SealNum",
-                                            "MeterMaxM3",
-                                            "GodVvoda",
-                                        ],
-                                    ),
-                                ],
-                            ),
-                            (
-                                "contractTODocuments",
-                                [("contract", ["number"]), ("file", ["id"])],
-                            ),
-                            ("liveBalance", ["number", "liveBalance"]),
-                            ("metersHistory", ["number", "data"]),
-                        ],
-                    ),
+                    (("contract", {"number": "number"}), contractDevicesFields),
                 ],
             )
         ],
@@ -275,11 +867,402 @@ class CaptchaResponse(NamedTuple):
     valid_until: datetime
 
 
+class LoginPage(NamedTuple):
+    csrf_token: str
+    site_key: str | None
+
+
+class XSystemAuthTokenCache:
+    """X-SYSTEM-AUTH token cache keyed by the main JS bundle location.
+
+    The token is embedded into the frontend bundle and is the same for every
+    account, therefore a single instance is shared between API objects."""
+
+    def __init__(
+        self,
+        main_js_location: str | None = None,
+        token: str | None = None,
+        on_update: Callable[["XSystemAuthTokenCache"], Any] | None = None,
+    ) -> None:
+        self.main_js_location = main_js_location
+        self.token = token
+        self.on_update = on_update
+        self.lock = asyncio.Lock()
+
+    def get(self, main_js_location: str) -> str | None:
+        if self.main_js_location == main_js_location:
+            return self.token
+        return None
+
+    def set(self, main_js_location: str, token: str) -> None:
+        self.main_js_location = main_js_location
+        self.token = token
+        if self.on_update is not None:
+            self.on_update(self)
+
+    def as_dict(self) -> dict[str, str | None]:
+        return {"main_js_location": self.main_js_location, "token": self.token}
+
+    def load(self, data: Mapping[str, Any]) -> None:
+        self.main_js_location = data.get("main_js_location")
+        self.token = data.get("token")
+
+
+X_SYSTEM_AUTH_TOKEN_CACHE = XSystemAuthTokenCache()
+
+
+class AccountLoginRegistry:
+    """Serialize logins of the same account across API objects.
+
+    Concurrent non-interactive logins share a single attempt and its result,
+    while interactive authentication waits for other logins to finish."""
+
+    def __init__(self) -> None:
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._logins: dict[str, asyncio.Future] = {}
+
+    @staticmethod
+    def get_key(username: str) -> str:
+        return username.strip().lower()
+
+    def lock(self, username: str) -> asyncio.Lock:
+        key = self.get_key(username)
+        if (lock := self._locks.get(key)) is None:
+            lock = asyncio.Lock()
+            self._locks[key] = lock
+        return lock
+
+    async def login(self, username: str, factory: Callable[[], Awaitable[_T]]) -> _T:
+        key = self.get_key(username)
+        if (future := self._logins.get(key)) is None:
+            future = _create_background_task(self._login(username, factory))
+            self._logins[key] = future
+            future.add_done_callback(lambda _: self._logins.pop(key, None))
+        else:
+            _LOGGER.debug("Joining in-flight login for %s", username)
+        return await asyncio.shield(future)
+
+    async def _login(self, username: str, factory: Callable[[], Awaitable[_T]]) -> _T:
+        async with self.lock(username):
+            return await factory()
+
+
+ACCOUNT_LOGINS = AccountLoginRegistry()
+
+
+class OperationResult(NamedTuple):
+    """Result of a single operation within GraphQL batch"""
+
+    data: dict[str, Any] | None
+    errors: list[Any] | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.data is not None and not self.errors
+
+    def unwrap(self) -> dict[str, Any]:
+        if self.errors:
+            raise QueryOperationException(self.errors)
+        if self.data is None:
+            raise QueryOperationException("no data returned")
+        return self.data
+
+
+class RetryPolicy(NamedTuple):
+    """Retry policy for GraphQL batch requests.
+
+    Attempt limits include the first attempt and are set separately for
+    timeouts, server (5xx and connection) errors and decoding errors, and
+    for failed operations which are retried without the rest of the batch."""
+
+    timeout_attempts: int = 3
+    server_error_attempts: int = 3
+    decoding_error_attempts: int = 2
+    operation_attempts: int = 2
+    base_delay: float = 1.0
+    max_delay: float = 30.0
+
+    def should_retry(self, exc: Exception, attempt: int) -> bool:
+        if isinstance(exc, QueryTimeoutException):
+            max_attempts = self.timeout_attempts
+        elif isinstance(exc, QueryServerErrorException):
+            max_attempts = self.server_error_attempts
+        elif isinstance(exc, QueryDecodingException):
+            max_attempts = self.decoding_error_attempts
+        else:
+            return False
+        return attempt + 1 < max_attempts
+
+    def get_delay(self, attempt: int) -> float:
+        """Exponential backoff with jitter over its upper half"""
+        delay = min(self.max_delay, self.base_delay * 2**attempt)
+        return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Suspend requests to the backend after consecutive failures.
+
+    Once opened, a single probe request is let through every
+    `recovery_timeout` seconds; its success closes the circuit."""
+
+    def __init__(
+        self, failure_threshold: int = 5, recovery_timeout: float = 300.0
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._probing = False
+
+    @property
+    def is_open(self) -> bool:
+        return self._opened_at is not None
+
+    def before_request(self) -> None:
+        if self._opened_at is None:
+            return
+        if time.monotonic() - self._opened_at < self.recovery_timeout:
+            raise CircuitOpenException("backend requests are suspended after failures")
+        # Let probe through, while suspending other requests for the period
+        self._opened_at = time.monotonic()
+        self._probing = True
+
+    def record_success(self) -> None:
+        if self._opened_at is not None:
+            _LOGGER.info("Backend has recovered, resuming requests")
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._probing or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                _LOGGER.warning(
+                    "Suspending backend requests for %.0f seconds after %d failures",
+                    self.recovery_timeout,
+                    self._failures,
+                )
+            self._opened_at = time.monotonic()
+        self._probing = False
+
+
+BACKEND_CIRCUIT_BREAKER = CircuitBreaker()
+
+
+class RequestPriority(IntEnum):
+    HIGH = 0
+    NORMAL = 1
+    LOW = 2
+
+
+class TokenBucketRateLimiter:
+    """Token bucket rate limiter with prioritized waiters.
+
+    Up to `burst` requests pass immediately, afterwards requests are
+    released at `rate` per second, higher priority ones first."""
+
+    def __init__(self, rate: float = 2.0, burst: int = 10) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._counter = itertools.count()
+        self._release_handle: asyncio.TimerHandle | None = None
+
+        self.requests_count = 0
+        self.delayed_count = 0
+        self.total_delay = 0.0
+        self.max_delay = 0.0
+
+    @property
+    def queued_count(self) -> int:
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    @property
+    def metrics(self) -> dict[str, int | float]:
+        return {
+            "requests": self.requests_count,
+            "delayed": self.delayed_count,
+            "queued": self.queued_count,
+            "total_delay": round(self.total_delay, 3),
+            "average_delay": round(
+                self.total_delay / self.delayed_count if self.delayed_count else 0.0,
+                3,
+            ),
+            "max_delay": round(self.max_delay, 3),
+        }
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            float(self.burst), self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+
+    def _schedule_release(self) -> None:
+        if self._release_handle is not None or not self._waiters:
+            return
+        self._release_handle = asyncio.get_running_loop().call_later(
+            max(0.0, (1 - self._tokens) / self.rate), self._release
+        )
+
+    def _release(self) -> None:
+        self._release_handle = None
+        self._refill()
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # Waiter has been cancelled
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        self._schedule_release()
+
+    async def acquire(self, priority: int = RequestPriority.NORMAL) -> float:
+        """Wait for request slot, returning time spent in queue"""
+        self.requests_count += 1
+        self._refill()
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return 0.0
+
+        started_at = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self._schedule_release()
+        await future
+
+        delay = time.monotonic() - started_at
+        self.delayed_count += 1
+        self.total_delay += delay
+        self.max_delay = max(self.max_delay, delay)
+        return delay
+
+
+class HostRateLimiter:
+    """Token bucket rate limiters maintained separately for every host"""
+
+    def __init__(self, rate: float = 2.0, burst: int = 10) -> None:
+        self.rate = rate
+        self.burst = burst
+        self._limiters: dict[str, TokenBucketRateLimiter] = {}
+
+    def for_host(self, host: str) -> TokenBucketRateLimiter:
+        if (limiter := self._limiters.get(host)) is None:
+            limiter = TokenBucketRateLimiter(self.rate, self.burst)
+            self._limiters[host] = limiter
+        return limiter
+
+    @property
+    def metrics(self) -> dict[str, dict[str, int | float]]:
+        return {host: limiter.metrics for host, limiter in self._limiters.items()}
+
+    async def acquire(self, url: str, priority: int = RequestPriority.NORMAL) -> float:
+        host = urlsplit(url).netloc
+        delay = await self.for_host(host).acquire(priority)
+        if delay:
+            _LOGGER.debug("Request to %s was delayed for %.3f seconds", host, delay)
+        return delay
+
+
+RATE_LIMITER = HostRateLimiter()
+
+
+class QueryBatcher:
+    """Collect queries issued within a short window into a single batch.
+
+    Batch is sent once the window elapses or maximum batch size is reached,
+    and every caller receives the result of its own operation."""
+
+    def __init__(
+        self,
+        perform_operations: Callable[
+            [list[tuple[str, dict[str, Any] | None]]],
+            Awaitable[list["OperationResult"]],
+        ],
+        window: float = 0.01,
+        max_batch_size: int = 20,
+    ) -> None:
+        self.perform_operations = perform_operations
+        self.window = window
+        self.max_batch_size = max_batch_size
+        self._pending: list[
+            tuple[tuple[str, dict[str, Any] | None], asyncio.Future[dict[str, Any]]]
+        ] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+
+    async def perform(
+        self, query: str, variables: dict[str, Any] | None = None
+    ) -> dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[dict[str, Any]] = loop.create_future()
+        self._pending.append(((query, variables), future))
+
+        if len(self._pending) >= self.max_batch_size:
+            self.flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window, self.flush)
+
+        return await future
+
+    def flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not (pending := self._pending):
+            return
+        self._pending = []
+        _create_background_task(self._perform_batch(pending))
+
+    async def _perform_batch(
+        self,
+        pending: list[
+            tuple[tuple[str, dict[str, Any] | None], asyncio.Future[dict[str, Any]]]
+        ],
+    ) -> None:
+        # Skip operations of callers which are no longer waiting
+        pending = [item for item in pending if not item[1].done()]
+        if not pending:
+            return
+        if len(pending) > 1:
+            _LOGGER.debug("Sending %d batched queries", len(pending))
+
+        try:
+            results = await self.perform_operations([query for query, _ in pending])
+        except asyncio.CancelledError:
+            for _, future in pending:
+                future.cancel()
+            raise
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        for (_, future), result in zip(pending, results):
+            if future.done():
+                continue
+            try:
+                future.set_result(result.unwrap())
+            except QueryFailedException as exc:
+                future.set_exception(exc)
+
+
 class MosoblgazAPI:
     BASE_URL = "https://lkk.mosoblgaz.ru"
     AUTH_URL = BASE_URL + "/auth/login"
     BATCH_URL = BASE_URL + "/graphql/batch"
     CAPTCHA_URL = "https://captcha.mosoblgaz.ru"
+    STREAM_CHUNK_SIZE = 65536
+
+    SITE_KEY_PATTERN = re.compile(
+        re.escape(CAPTCHA_URL + "/api.js?site-key=") + r"([a-f0-9]+)"
+    )
+    CSRF_TOKEN_PATTERN = re.compile(r'csrf_token"\s+value="([^"]+)')
+    MIN_TOKEN_LIFETIME = 60.0
+    LOGIN_DEPENDENCIES_TTL = 300.0
 
     def __init__(
         self,
@@ -289,49 +1272,152 @@ class MosoblgazAPI:
         x_system_auth_token: str | None = None,
         site_key: str | None = None,
         graphql_token: str | None = None,
+        x_system_auth_cache: XSystemAuthTokenCache | None = None,
+        stream_main_js: bool = True,
+        data_features: Collection[str] | None = None,
+        aliased_contracts: bool = True,
+        contracts_chunk_size: int = 10,
+        max_concurrent_chunks: int = 2,
+        retry_policy: "RetryPolicy | None" = None,
+        circuit_breaker: "CircuitBreaker | None" = None,
+        rate_limiter: HostRateLimiter | None = None,
+        account_logins: AccountLoginRegistry | None = None,
+        json_codec: "type[JsonCodec] | None" = None,
+        batch_window: float = 0.01,
+        max_batch_size: int = 20,
+        persisted_queries: bool = False,
+        statuses_ttl: float = 240.0,
+        wire_tracer: WireTracer | None = None,
+        response_profiler: ResponseProfiler | None = None,
     ):
         self.username = username
         self.password = password
+        self.graphql_token_lifetime: float | None = None
+        self.graphql_token_confirmed_at: float | None = None
         self.graphql_token = graphql_token
         self.x_system_auth_token = x_system_auth_token
         self.site_key = site_key
+        self.stream_main_js = stream_main_js
+        self.data_features = data_features
+        self.aliased_contracts = aliased_contracts
+        self.contracts_chunk_size = contracts_chunk_size
+        self.max_concurrent_chunks = max_concurrent_chunks
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or BACKEND_CIRCUIT_BREAKER
+        self.rate_limiter = rate_limiter or RATE_LIMITER
+        self.account_logins = account_logins or ACCOUNT_LOGINS
+        self.wire_tracer = wire_tracer or WireTracer()
+        self.response_profiler = response_profiler
+        self.json_codec = json_codec or DEFAULT_JSON_CODEC
+        self.query_batcher = QueryBatcher(
+            self.perform_operations, batch_window, max_batch_size
+        )
+        self.persisted_queries = persisted_queries
+        self.persisted_queries_supported: bool | None = None
+        self.statuses_ttl = statuses_ttl
+        self.statuses: dict[str, bool | str] | None = None
+        self.statuses_updated_at: float | None = None
 
         self._session = session or aiohttp.ClientSession()
+        self._x_system_auth_cache = x_system_auth_cache or X_SYSTEM_AUTH_TOKEN_CACHE
         self._last_captcha: CaptchaResponse | None = None
+        self._login_page_task: asyncio.Future[LoginPage] | None = None
+        self._x_system_auth_task: asyncio.Future[str] | None = None
+        self._login_dependencies_fetched_at: float | None = None
 
         self._contracts: dict[str, Contract] = {}
+        self._contract_type_name: str | None = None
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._registered_query_hashes: set[str] = set()
+        self._full_text_query_hashes: set[str] = set()
+
+    @asynccontextmanager
+    async def _request(
+        self,
+        method: str,
+        url: str,
+        priority: int = RequestPriority.NORMAL,
+        **kwargs,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """Perform rate limited request"""
+        await self.rate_limiter.acquire(url, priority)
+        async with self._session.request(method, url, **kwargs) as response:
+            yield response
 
     @property
     def last_captcha(self) -> CaptchaResponse | None:
         return self._last_captcha
 
+    @property
+    def graphql_token(self) -> str | None:
+        return self._graphql_token
+
+    @graphql_token.setter
+    def graphql_token(self, value: str | None) -> None:
+        if value is not None and value == getattr(self, "_graphql_token", None):
+            return
+        self._graphql_token = value
+        self.graphql_token_issued_at = None if value is None else time.time()
+        self.graphql_token_confirmed_at = None
+
+    @property
+    def graphql_token_expires_at(self) -> float | None:
+        """Timestamp at which GraphQL token is expected to expire.
+
+        Expiration embedded into the token takes precedence over the token
+        lifetime learned from previous rejections."""
+        if (graphql_token := self._graphql_token) is None:
+            return None
+        if (expires_at := get_token_expiry(graphql_token)) is not None:
+            return expires_at
+        if self.graphql_token_lifetime is None or self.graphql_token_issued_at is None:
+            return None
+        return self.graphql_token_issued_at + self.graphql_token_lifetime
+
+    def invalidate_graphql_token(self) -> None:
+        """Drop rejected GraphQL token and learn its lifetime.
+
+        The token is known to have lived at least until it was last used
+        successfully, which is a safe estimate for refreshing next ones."""
+        issued_at = self.graphql_token_issued_at
+        confirmed_at = self.graphql_token_confirmed_at
+        if issued_at is not None and confirmed_at is not None:
+            lifetime = confirmed_at - issued_at
+            if lifetime >= self.MIN_TOKEN_LIFETIME:
+                _LOGGER.debug("Learned GraphQL token lifetime: %.0f seconds", lifetime)
+                self.graphql_token_lifetime = lifetime
+        self.graphql_token = None
+
+    async def refresh_tokens(self) -> str:
+        """Refresh X-SYSTEM-AUTH and GraphQL tokens ahead of expiration.
+
+        Authenticated session is reused when present, otherwise a full login
+        is performed, which fails when CAPTCHA input is required."""
+        await self.update_x_system_auth_token()
+
+        if self.has_session_cookies:
+            try:
+                return await self.refresh_graphql_token()
+            except AuthenticationFailedException as exc:
+                _LOGGER.debug("Could not refresh GraphQL token with session: %s", exc)
+
+        return await self.login()
+
     @property
     def is_logged_in(self):
         return self.graphql_token is not None
 
-    async def fetch_csrf_token(self):
+    async def fetch_login_page(self) -> LoginPage:
+        """Fetch login page and extract CSRF token and site key in one pass"""
         fetch_url = self.AUTH_URL
-        _LOGGER.debug("Fetching CSRF token")
+        _LOGGER.debug("Fetching login page")
 
         try:
-            async with self._session.get(fetch_url) as request:
+            async with self._request(
+                "GET", fetch_url, priority=RequestPriority.HIGH
+            ) as request:
                 html = await request.text()
 
-                if m := re.search(
-                    re.escape(self.CAPTCHA_URL + "/api.js?site-key=") + r"([a-f0-9]+)",
-                    html,
-                ):
-                    _LOGGER.debug("Site key: %s", m.group(1))
-                    # Update site key
-                    self.site_key = m.group(1)
-                else:
-                    _LOGGER.debug("No site key found on request")
-
-                results = re.search(r'csrf_token"\s+value="([^"]+)', html)
-
-                if results is None:
-                    raise AuthenticationFailedException("No CSRF token found")
-
         except aiohttp.ClientError as exc:
             error_msg = f"Error fetching CSRF token: {exc}"
             _LOGGER.error(error_msg)
@@ -342,47 +1428,133 @@ class MosoblgazAPI:
             _LOGGER.error(error_msg)
             raise AuthenticationFailedException(error_msg)
 
-        csrf_token = results[1]
+        if m := self.SITE_KEY_PATTERN.search(html):
+            _LOGGER.debug("Site key: %s", m.group(1))
+            # Update site key
+            self.site_key = m.group(1)
+        else:
+            _LOGGER.debug("No site key found on request")
 
-        _LOGGER.debug(f"Fetched CSRF token: {csrf_token}")
+        if (results := self.CSRF_TOKEN_PATTERN.search(html)) is None:
+            raise AuthenticationFailedException("No CSRF token found")
 
-        return csrf_token
+        _LOGGER.debug("Fetched CSRF token: %s", mask_secret(results[1]))
 
-    async def fetch_x_system_auth_token(self):
-        try:
-            async with self._session.get(
-                self.BASE_URL + "/lkk3/asset-manifest.json",
-                allow_redirects=False,
-            ) as request:
-                if request.status != 200:
-                    raise AuthenticationFailedException(
-                        "Asset manifest could not be fetched"
-                    )
+        return LoginPage(csrf_token=results[1], site_key=self.site_key)
 
-                manifest_contents = await request.json()
+    async def fetch_csrf_token(self):
+        return (await self.fetch_login_page()).csrf_token
+
+    def _prefetch_login_dependencies(self) -> None:
+        """Start fetching login page and X-SYSTEM-AUTH token in background"""
+        if (
+            self._login_dependencies_fetched_at is not None
+            and time.monotonic() - self._login_dependencies_fetched_at
+            >= self.LOGIN_DEPENDENCIES_TTL
+        ):
+            # CSRF token of a stale login page will be rejected
+            self._clear_login_dependencies()
+        if self._login_dependencies_fetched_at is None:
+            self._login_dependencies_fetched_at = time.monotonic()
+        if not _is_task_reusable(self._login_page_task):
+            self._login_page_task = _create_background_task(self.fetch_login_page())
+        if not _is_task_reusable(self._x_system_auth_task):
+            self._x_system_auth_task = _create_background_task(
+                self.fetch_x_system_auth_token()
+            )
 
-                try:
-                    main_js_location = manifest_contents["files"]["main.js"]
-                except KeyError:
-                    raise AuthenticationFailedException(
-                        "Asset manifest does not contain main.js"
-                    )
+    def _clear_login_dependencies(self) -> None:
+        """Discard prefetched login dependencies"""
+        for task in (self._login_page_task, self._x_system_auth_task):
+            if task is not None:
+                task.cancel()
+        self._login_page_task = None
+        self._x_system_auth_task = None
+        self._login_dependencies_fetched_at = None
+
+    async def _pop_login_dependencies(self) -> tuple[LoginPage, str]:
+        """Await prefetched login dependencies, consuming them"""
+        self._prefetch_login_dependencies()
+        login_page_task, self._login_page_task = self._login_page_task, None
+        x_system_auth_task, self._x_system_auth_task = self._x_system_auth_task, None
+        self._login_dependencies_fetched_at = None
+        return await asyncio.gather(login_page_task, x_system_auth_task)
+
+    async def fetch_main_js_location(self) -> str:
+        """Fetch location of the main JS bundle from the asset manifest"""
+        async with self._request(
+            "GET",
+            self.BASE_URL + "/lkk3/asset-manifest.json",
+            allow_redirects=False,
+            priority=RequestPriority.LOW,
+        ) as request:
+            if request.status != 200:
+                raise AuthenticationFailedException(
+                    "Asset manifest could not be fetched"
+                )
 
-            async with self._session.get(
-                self.BASE_URL + main_js_location, allow_redirects=False
-            ) as request:
-                if request.status != 200:
-                    raise AuthenticationFailedException(
-                        "Main JS code could not be fetched"
-                    )
-                js_code = await request.text()
-                results = re.search(
-                    r'[\'"]X-SYSTEM-AUTH-TOKEN[\'"]\s*:\s*[\'"]([^\'"]+)[\'"]',
-                    js_code,
+            manifest_contents = await request.json()
+
+            try:
+                return manifest_contents["files"]["main.js"]
+            except KeyError:
+                raise AuthenticationFailedException(
+                    "Asset manifest does not contain main.js"
+                )
+
+    async def fetch_main_js_x_system_auth_token(self, main_js_location: str) -> str:
+        """Extract X-SYSTEM-AUTH token from the main JS bundle"""
+        async with self._request(
+            "GET",
+            self.BASE_URL + main_js_location,
+            allow_redirects=False,
+            priority=RequestPriority.LOW,
+        ) as request:
+            if request.status != 200:
+                raise AuthenticationFailedException("Main JS code could not be fetched")
+
+            if self.stream_main_js:
+                x_system_auth_token = await search_stream(
+                    request.content,
+                    X_SYSTEM_AUTH_TOKEN_PATTERN,
+                    self.STREAM_CHUNK_SIZE,
                 )
+                if x_system_auth_token is not None:
+                    # Do not download the rest of the bundle
+                    request.close()
+            else:
+                results = X_SYSTEM_AUTH_TOKEN_PATTERN.search(await request.read())
+                x_system_auth_token = None if results is None else results[1]
+
+            if x_system_auth_token is None:
+                raise AuthenticationFailedException("No X-SYSTEM-AUTH token found")
+
+        return x_system_auth_token.decode("utf-8")
+
+    async def fetch_x_system_auth_token(self):
+        cache = self._x_system_auth_cache
 
-                if results is None:
-                    raise AuthenticationFailedException("No X-SYSTEM-AUTH token found")
+        try:
+            main_js_location = await self.fetch_main_js_location()
+
+            # Download main JS bundle only when it changed since the last fetch
+            if (x_system_auth_token := cache.get(main_js_location)) is None:
+                async with cache.lock:
+                    if (x_system_auth_token := cache.get(main_js_location)) is None:
+                        x_system_auth_token = (
+                            await self.fetch_main_js_x_system_auth_token(
+                                main_js_location
+                            )
+                        )
+                        cache.set(main_js_location, x_system_auth_token)
+                        _LOGGER.debug(
+                            "Fetched X-SYSTEM-AUTH token: %s",
+                            mask_secret(x_system_auth_token),
+                        )
+            else:
+                _LOGGER.debug(
+                    "Using cached X-SYSTEM-AUTH token for %s", main_js_location
+                )
 
         except aiohttp.ClientError as exc:
             error_msg = f"Error fetching X-SYSTEM-AUTH token: {exc}"
@@ -394,10 +1566,6 @@ class MosoblgazAPI:
             _LOGGER.error(error_msg)
             raise AuthenticationFailedException(error_msg)
 
-        x_system_auth_token = results[1]
-
-        _LOGGER.debug(f"Fetched X-SYSTEM-AUTH token: {x_system_auth_token}")
-
         return x_system_auth_token
 
     async def update_x_system_auth_token(self) -> str:
@@ -415,10 +1583,12 @@ class MosoblgazAPI:
                 )
         if not result:
             raise AuthenticationFailedException("captcha response cannot be empty")
-        async with self._session.put(
+        async with self._request(
+            "PUT",
             self.CAPTCHA_URL + "/api/captchas/" + captcha.token,
             json={"inputValue": result},
             headers={"Site-Key": self.site_key} if self.site_key else {},
+            priority=RequestPriority.HIGH,
         ) as response:
             data = await response.json()
 
@@ -437,24 +1607,30 @@ class MosoblgazAPI:
         self, action: str = "login"
     ) -> CaptchaResponse | str:
         """Retrieve temporary token or captcha token"""
+        # Login page and X-SYSTEM-AUTH token are required by authentication
+        # later on, hence fetch them alongside the captcha request.
+        self._prefetch_login_dependencies()
+
         site_key = self.site_key
         if not site_key:
-            await self.fetch_csrf_token()
+            await asyncio.shield(self._login_page_task)
             site_key = self.site_key
             if not site_key:
                 raise AuthenticationFailedException(
                     "site key not found for temporary token request"
                 )
 
-        _LOGGER.debug(f"Fetching temporary token for action: {action}")
+        _LOGGER.debug("Fetching temporary token for action: %s", action)
 
         data: dict | None = None
         if self._last_captcha:
             try:
-                async with self._session.put(
+                async with self._request(
+                    "PUT",
                     self.CAPTCHA_URL + "/api/captchas/reissue",
                     data=self._last_captcha.token,
                     headers={"Site-Key": self.site_key},
+                    priority=RequestPriority.HIGH,
                 ) as response:
                     data = await response.json()
             except aiohttp.ClientResponseError:
@@ -466,10 +1642,12 @@ class MosoblgazAPI:
 
         if data is None:
             # Perform POST request for captchas
-            async with self._session.post(
+            async with self._request(
+                "POST",
                 self.CAPTCHA_URL + "/api/captchas",
                 json={"action": action},
                 headers={"Site-Key": self.site_key},
+                priority=RequestPriority.HIGH,
             ) as response:
                 data = await response.json()
 
@@ -509,14 +1687,44 @@ class MosoblgazAPI:
             raise AuthenticationFailedException("temporary token is empty")
         return temporary_token
 
+    async def login(self) -> str:
+        """Perform login which does not require user interaction.
+
+        Concurrent logins of the same account, including ones performed by
+        other API objects, share a single attempt and its tokens."""
+        graphql_token, x_system_auth_token = await self.account_logins.login(
+            self.username, self._login
+        )
+        self.x_system_auth_token = x_system_auth_token
+        self.graphql_token = graphql_token
+        return graphql_token
+
+    async def _login(self) -> tuple[str, str | None]:
+        try:
+            temporary_token = await self.fetch_temporary_token()
+            if isinstance(temporary_token, CaptchaResponse):
+                raise AuthenticationFailedException("CAPTCHA input required")
+            graphql_token = await self._authenticate(temporary_token)
+        except BaseException:
+            # Do not leave prefetched dependencies for the next attempt
+            self._clear_login_dependencies()
+            raise
+        return graphql_token, self.x_system_auth_token
+
     async def authenticate(self, temporary_token: str, captcha_result: str = "") -> str:
-        """Perform authentication.
+        """Perform authentication, waiting for other logins of the account.
 
         Captcha argument contains: [token, response]."""
-        csrf_token, x_system_auth_token = await asyncio.gather(
-            self.fetch_csrf_token(),
-            self.fetch_x_system_auth_token(),
-        )
+        async with self.account_logins.lock(self.username):
+            return await self._authenticate(temporary_token, captcha_result)
+
+    async def _authenticate(
+        self, temporary_token: str, captcha_result: str = ""
+    ) -> str:
+        self.raise_for_cached_statuses()
+
+        login_page, x_system_auth_token = await self._pop_login_dependencies()
+        csrf_token = login_page.csrf_token
 
         self.x_system_auth_token = x_system_auth_token
 
@@ -530,13 +1738,15 @@ class MosoblgazAPI:
                 "_remember_me": "on",
             }
 
-            _LOGGER.debug("REQUEST DATA: %s", auth_request_data)
+            self.wire_tracer.trace("Authentication request", auth_request_data)
 
             # Perform authentication request
-            async with self._session.post(
+            async with self._request(
+                "POST",
                 self.AUTH_URL,
                 data=auth_request_data,
                 headers={"X-Requested-With": "XMLHttpRequest"},
+                priority=RequestPriority.HIGH,
             ) as response:
                 try:
                     data = await response.json()
@@ -548,30 +1758,16 @@ class MosoblgazAPI:
                     if isinstance(data.get("errors"), dict):
                         raise AuthenticationFailedException(*data["errors"].items())
                     raise AuthenticationFailedException("unknown error occurred")
-                _LOGGER.debug("Response: %s", await response.text())
+                self.wire_tracer.trace("Authentication response", data)
                 if response.status not in [200, 301, 302]:
-                    if _LOGGER.level == logging.DEBUG:
-                        _LOGGER.debug(f"Response: {await response.text()}")
-
                     raise AuthenticationFailedException(
                         f"Error status ({response.status})"
                     )
 
-                _LOGGER.debug(f"Authentication on account {self.username} successful")
+                _LOGGER.debug("Authentication on account %s successful", self.username)
 
             # Retrieve GraphQL token
-            async with self._session.head(self.BASE_URL + "/lkk3/") as response:
-                graphql_token = response.headers.get("Token")
-
-                if not graphql_token:
-                    _LOGGER.debug(
-                        f"No graphql token found in: headers={response.headers}, body={await response.text()}"
-                    )
-                    raise AuthenticationFailedException("Failed to grab GraphQL token")
-
-                _LOGGER.debug(f"GraphQL token: {graphql_token}")
-
-                self.graphql_token = graphql_token
+            graphql_token = await self.refresh_graphql_token()
 
         except asyncio.TimeoutError:
             _LOGGER.error("Timeout executing authentication request")
@@ -581,76 +1777,325 @@ class MosoblgazAPI:
 
         return graphql_token
 
+    async def refresh_graphql_token(self) -> str:
+        """Retrieve GraphQL token using authenticated session cookies"""
+        try:
+            async with self._request(
+                "HEAD", self.BASE_URL + "/lkk3/", priority=RequestPriority.HIGH
+            ) as response:
+                graphql_token = response.headers.get("Token")
+
+                if not graphql_token:
+                    if self.wire_tracer.enabled:
+                        self.wire_tracer.trace(
+                            "No GraphQL token found in response",
+                            {
+                                "headers": dict(response.headers),
+                                "body": await response.text(),
+                            },
+                        )
+                    raise AuthenticationFailedException("Failed to grab GraphQL token")
+
+        except aiohttp.ClientError as exc:
+            error_msg = f"Error fetching GraphQL token: {exc}"
+            _LOGGER.error(error_msg)
+            raise AuthenticationFailedException(error_msg)
+
+        _LOGGER.debug("GraphQL token: %s", mask_secret(graphql_token))
+
+        self.graphql_token = graphql_token
+        return graphql_token
+
+    @property
+    def has_session_cookies(self) -> bool:
+        return len(self._session.cookie_jar) > 0
+
+    def export_cookies(self) -> list[dict[str, str]]:
+        """Export session cookies for persistence"""
+        return [
+            {
+                "url": "https://%s%s" % (morsel["domain"], morsel["path"] or "/"),
+                "cookie": morsel.OutputString(),
+            }
+            for morsel in self._session.cookie_jar
+            if morsel["domain"]
+        ]
+
+    def clear_cookies(self) -> None:
+        """Drop all session cookies"""
+        self._session.cookie_jar.clear()
+
+    def import_cookies(self, cookies: Iterable[Mapping[str, str]]) -> None:
+        """Restore session cookies exported earlier"""
+        for cookie_data in cookies:
+            cookie = SimpleCookie()
+            try:
+                cookie.load(cookie_data["cookie"])
+                self._session.cookie_jar.update_cookies(
+                    cookie, yarl.URL(cookie_data["url"])
+                )
+            except (CookieError, KeyError, ValueError) as exc:
+                _LOGGER.debug("Skipping invalid stored cookie: %s", exc)
+
     async def perform_single_query(
         self, query: str, variables: dict[str, Any] | None = None
     ):
-        return (await self.perform_queries([(query, variables)]))[0]
+        """Perform query within a batch shared with concurrent callers."""
+        return await self.query_batcher.perform(query, variables)
 
     async def perform_queries(
         self, queries: list[str | tuple[str, dict[str, Any] | None]]
     ) -> list[dict[str, Any]]:
-        """Perform multiple queries at once."""
+        """Perform multiple queries at once, failing if any of them fails."""
+        return [result.unwrap() for result in await self.perform_operations(queries)]
+
+    async def perform_operations(
+        self, queries: list[str | tuple[str, dict[str, Any] | None]]
+    ) -> list[OperationResult]:
+        """Perform multiple queries at once, returning result of each one."""
         graphql_token = self.graphql_token
         if graphql_token is None:
             raise AuthenticationFailedException("GraphQL token required")
 
-        payload = []
-        for query_variables in queries:
-            if isinstance(query_variables, str):
-                query = query_variables
-                variables = {}
+        payload = [
+            self._build_operation(query_variables) for query_variables in queries
+        ]
+
+        self.wire_tracer.trace("Sending payload", payload)
+
+        attempt = 0
+        while True:
+            self.circuit_breaker.before_request()
+            try:
+                if (
+                    self.persisted_queries
+                    and self.persisted_queries_supported is not False
+                ):
+                    results = await self._post_persisted_batch(payload, graphql_token)
+                else:
+                    results = await self._post_batch(payload, graphql_token)
+            except (
+                QueryTimeoutException,
+                QueryServerErrorException,
+                QueryDecodingException,
+            ) as exc:
+                self.circuit_breaker.record_failure()
+                if not self.retry_policy.should_retry(exc, attempt):
+                    raise
+                delay = self.retry_policy.get_delay(attempt)
+                _LOGGER.warning(
+                    "Query attempt %d failed (%s), retrying in %.1f seconds",
+                    attempt + 1,
+                    exc,
+                    delay,
+                )
+                await asyncio.sleep(delay)
+                attempt += 1
             else:
-                query, variables = query_variables
+                self.circuit_breaker.record_success()
+                if graphql_token == self._graphql_token:
+                    self.graphql_token_confirmed_at = time.time()
+                return results
 
-            operation_name = None
-            if query.startswith("query "):
-                try:
-                    name_start = query.index(" ") + 1
-                    name_end = query.index(" ", name_start)
-                    operation_name = query[name_start:name_end] or None
-                except ValueError:
-                    pass
-
-            payload.append(
-                {
-                    "operationName": operation_name,
-                    "query": query,
-                    "variables": {} if variables is None else variables,
-                }
-            )
+    @staticmethod
+    def _build_operation(
+        query_variables: str | tuple[str, dict[str, Any] | None],
+    ) -> dict[str, Any]:
+        if isinstance(query_variables, str):
+            query = query_variables
+            variables = {}
+        else:
+            query, variables = query_variables
+
+        operation_name = None
+        if query.startswith("query "):
+            try:
+                name_start = query.index(" ") + 1
+                name_end = query.index(" ", name_start)
+                operation_name = query[name_start:name_end] or None
+            except ValueError:
+                pass
+
+        return {
+            "operationName": operation_name,
+            "query": query,
+            "variables": {} if variables is None else variables,
+        }
+
+    @staticmethod
+    def _persisted_operation(
+        operation: dict[str, Any], query_hash: str, with_query: bool = False
+    ) -> dict[str, Any]:
+        persisted_operation = {
+            key: value
+            for key, value in operation.items()
+            if with_query or key != "query"
+        }
+        persisted_operation["extensions"] = {
+            "persistedQuery": {"version": 1, "sha256Hash": query_hash}
+        }
+        return persisted_operation
+
+    async def _post_persisted_batch(
+        self, payload: list[dict[str, Any]], graphql_token: str
+    ) -> list[OperationResult]:
+        """Send query hashes instead of full documents.
+
+        Operations with hashes unknown to the server are resent with full
+        documents, which registers them. Hashes which the server does not
+        retain after registration are always sent with full documents."""
+        if self.persisted_queries_supported is None:
+            if not await self.probe_persisted_queries():
+                return await self._post_batch(payload, graphql_token)
+
+        query_hashes = [get_query_hash(operation["query"]) for operation in payload]
+        results = await self._post_batch(
+            [
+                self._persisted_operation(
+                    operation,
+                    query_hash,
+                    query_hash in self._full_text_query_hashes,
+                )
+                for operation, query_hash in zip(payload, query_hashes)
+            ],
+            graphql_token,
+        )
+
+        resend_indices = []
+        for i, result in enumerate(results):
+            if (error := get_persisted_query_error(result)) is None:
+                continue
+            if error == PERSISTED_QUERY_NOT_SUPPORTED:
+                _LOGGER.info("Persisted queries are not supported, disabling")
+                self.persisted_queries_supported = False
+            elif query_hashes[i] in self._registered_query_hashes:
+                _LOGGER.debug(
+                    "Persisted query %s is not retained, sending full document",
+                    query_hashes[i],
+                )
+                self._full_text_query_hashes.add(query_hashes[i])
+            resend_indices.append(i)
+
+        if not resend_indices:
+            return results
+
+        resend_results = await self._post_batch(
+            [
+                (
+                    payload[i]
+                    if self.persisted_queries_supported is False
+                    else self._persisted_operation(payload[i], query_hashes[i], True)
+                )
+                for i in resend_indices
+            ],
+            graphql_token,
+        )
+        for i, result in zip(resend_indices, resend_results):
+            results[i] = result
+            if result.ok and self.persisted_queries_supported is not False:
+                self._registered_query_hashes.add(query_hashes[i])
+        return results
 
-        if _LOGGER.level == logging.DEBUG:
-            _LOGGER.debug(f"Sending payload: {payload}")
+    async def probe_persisted_queries(self) -> bool:
+        """Check whether server supports persisted queries.
 
+        Unknown hash of a lightweight query is sent, which is expected to be
+        either resolved or reported as not found by a supporting server."""
+        graphql_token = self.graphql_token
+        if graphql_token is None:
+            raise AuthenticationFailedException("GraphQL token required")
+
+        query = Queries.query("getInternalSystemStatuses")
+        result = (
+            await self._post_batch(
+                [
+                    self._persisted_operation(
+                        self._build_operation(query), get_query_hash(query)
+                    )
+                ],
+                graphql_token,
+            )
+        )[0]
+        error = get_persisted_query_error(result)
+        supported = error == PERSISTED_QUERY_NOT_FOUND or (error is None and result.ok)
+        _LOGGER.debug("Persisted queries supported: %s", supported)
+        self.persisted_queries_supported = supported
+        return supported
+
+    async def _post_batch(
+        self, payload: list[dict[str, Any]], graphql_token: str
+    ) -> list[OperationResult]:
         try:
-            async with self._session.post(
+            async with self._request(
+                "POST",
                 self.BATCH_URL,
-                json=payload,
-                headers={"token": graphql_token},
+                data=self.json_codec.dumps(payload),
+                headers={"token": graphql_token, "Content-Type": "application/json"},
             ) as response:
+                if response.status >= 500:
+                    raise QueryServerErrorException(
+                        f"Server error status ({response.status})"
+                    )
+                if response.status in (401, 403):
+                    raise AuthenticationFailedException(
+                        f"Authentication error status ({response.status})"
+                    )
+                if response.status >= 400:
+                    # Client errors are neither retried nor counted as failures
+                    raise QueryFailedException(
+                        f"Client error status ({response.status})"
+                    )
+                body = await response.read()
                 try:
-                    listed_data = list(map(lambda x: x["data"], await response.json()))
+                    decode_started_at = time.perf_counter()
+                    decoded = self.json_codec.loads(body)
+                    decode_time = time.perf_counter() - decode_started_at
+                    results = [
+                        OperationResult(x.get("data"), x.get("errors")) for x in decoded
+                    ]
+                    if len(results) != len(payload):
+                        raise ValueError("operations count mismatch")
                 except (
-                    json.decoder.JSONDecodeError,
-                    aiohttp.ContentTypeError,
+                    self.json_codec.decode_error,
                     ValueError,
+                    TypeError,
                     AttributeError,
                     LookupError,
                 ) as exc:
-                    _LOGGER.debug(f"Response text: {await response.text()}")
-                    raise QueryFailedException("decoding error") from exc
+                    self.wire_tracer.trace("Undecodable response", body)
+                    raise QueryDecodingException("decoding error") from exc
                 else:
-                    _LOGGER.debug(f"Received data: {listed_data}")
-                    return listed_data
+                    self.wire_tracer.trace("Received data", results)
+                    if self.response_profiler is not None:
+                        self.response_profiler.record(
+                            payload, decoded, decode_time, self.json_codec.dumps
+                        )
+                    return results
 
         except asyncio.TimeoutError:
             _LOGGER.error("Timeout executing query")
-            raise QueryFailedException("Timeout executing query")
+            raise QueryTimeoutException("Timeout executing query")
+
+        except aiohttp.ClientConnectionError as exc:
+            _LOGGER.error("Connection error executing query: %s", exc)
+            raise QueryServerErrorException(f"Connection error: {exc}") from exc
 
     @property
     def contracts(self) -> dict[str, "Contract"]:
         return self._contracts
 
+    def get_data_fingerprint(self, data: Mapping[str, Any]) -> bytes:
+        """Fingerprint contract data to detect unchanged documents.
+
+        Live balance changes independently of the rest of the document and
+        is applied on every update, hence it is not fingerprinted."""
+        return hashlib.blake2b(
+            self.json_codec.dumps(
+                {key: value for key, value in data.items() if key != "liveBalance"}
+            ),
+            digest_size=16,
+        ).digest()
+
     @staticmethod
     def check_statuses_response(
         statuses_response: dict[str, bool | str],
@@ -691,21 +2136,311 @@ class MosoblgazAPI:
             raise PartialOfflineException(", ".join(bad_statuses))
         return bad_statuses or None
 
+    def _set_statuses(self, statuses_response: dict[str, Any]) -> None:
+        self.statuses = statuses_response.get(
+            "internalSystemStatuses", statuses_response
+        )
+        self.statuses_updated_at = time.monotonic()
+
+    @property
+    def statuses_fresh(self) -> bool:
+        return (
+            self.statuses_updated_at is not None
+            and time.monotonic() - self.statuses_updated_at < self.statuses_ttl
+        )
+
+    def is_degraded(self, feature: str = SERVICE_FEATURE_DATA) -> bool:
+        """Check whether last known statuses report feature as offline"""
+        return self.statuses is not None and bool(
+            self.check_statuses_response(
+                self.statuses,
+                raise_for_statuses=False,
+                check_keys=SERVICE_FEATURE_STATUSES[feature],
+                with_default=False,
+            )
+        )
+
+    def raise_for_cached_statuses(self, feature: str = SERVICE_FEATURE_DATA) -> None:
+        """Fail without requests while cached degraded state has not expired"""
+        if self.statuses_fresh and self.is_degraded(feature):
+            self.check_statuses_response(
+                self.statuses,
+                check_keys=SERVICE_FEATURE_STATUSES[feature],
+                with_default=False,
+            )
+
+    async def fetch_statuses(self) -> dict[str, bool | str]:
+        """Fetch internal system statuses with a lightweight query"""
+        self._set_statuses(
+            await self.perform_single_query(Queries.query("getInternalSystemStatuses"))
+        )
+        return self.statuses
+
+    async def check_service_status(
+        self, feature: str = SERVICE_FEATURE_DATA, probe: bool = False
+    ) -> None:
+        """Ensure service feature is available before performing heavy requests.
+
+        Degraded state is trusted until it expires, after which statuses are
+        probed again. Healthy state is probed only when explicitly asked to
+        and the cached statuses have expired. Only cached state is checked
+        when not authenticated."""
+        self.raise_for_cached_statuses(feature)
+        if self.statuses_fresh or not (probe or self.is_degraded(feature)):
+            return
+        if self.graphql_token is None:
+            # Statuses can not be probed before authentication
+            return
+        _LOGGER.debug("Probing service statuses for %s", feature)
+        await self.fetch_statuses()
+        self.raise_for_cached_statuses(feature)
+
+    async def _single_flight(
+        self, key: Hashable, factory: Callable[[], Awaitable[_T]]
+    ) -> _T:
+        """Share result of an in-flight call between concurrent callers"""
+        if (future := self._in_flight.get(key)) is None:
+            future = _create_background_task(factory())
+            self._in_flight[key] = future
+            future.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        else:
+            _LOGGER.debug("Joining in-flight call: %s", key)
+        return await asyncio.shield(future)
+
     async def fetch_contracts(
         self, with_data: bool = False, raise_for_statuses: bool = True
+    ) -> dict[str, "Contract"]:
+        # Fetch with data also satisfies callers which do not require data
+        key = ("fetch_contracts", True, raise_for_statuses)
+        if with_data or key not in self._in_flight:
+            key = ("fetch_contracts", with_data, raise_for_statuses)
+        return await self._single_flight(
+            key, lambda: self._fetch_contracts(with_data, raise_for_statuses)
+        )
+
+    async def _fetch_contracts(
+        self, with_data: bool = False, raise_for_statuses: bool = True
     ) -> dict[str, "Contract"]:
         _LOGGER.debug("Fetching contracts list")
 
+        if raise_for_statuses:
+            await self.check_service_status()
+
         statuses_query = Queries.query("getInternalSystemStatuses")
         contracts_query = Queries.query("accountsList")
+        queries: list[str | tuple[str, dict[str, Any] | None]] = [
+            statuses_query,
+            contracts_query,
+        ]
 
-        response_list = await self.perform_queries([statuses_query, contracts_query])
-        status_response, contracts_response = response_list
+        # Speculatively request data for contracts known from the previous
+        # refresh; first chunk is sent within the same batch as the contracts
+        # list, while the rest of the chunks are requested concurrently.
+        speculative_ids = list(self._contracts.keys()) if with_data else []
+        chunk_size = self.contracts_chunk_size or len(speculative_ids) or 1
+        first_ids = speculative_ids[:chunk_size]
+        queries.extend(self._contracts_data_queries(first_ids))
+
+        semaphore = asyncio.Semaphore(self.max_concurrent_chunks)
+        other_chunks_task = None
+        if other_ids := speculative_ids[chunk_size:]:
+            other_chunks_task = _create_background_task(
+                self._fetch_contracts_data(other_ids, semaphore)
+            )
 
-        self.check_statuses_response(
-            status_response, raise_for_statuses=raise_for_statuses
+        try:
+            async with semaphore:
+                results = await self.perform_operations(queries)
+            status_result, contracts_result, *contract_data_results = results
+
+            self._set_statuses(status_result.unwrap())
+            self.check_statuses_response(
+                self.statuses, raise_for_statuses=raise_for_statuses
+            )
+
+            self._update_contracts_list(contracts_result.unwrap())
+
+            if with_data:
+                failed_ids = self._apply_contracts_results(
+                    first_ids, contract_data_results
+                )
+                if failed_ids := [
+                    contract_id
+                    for contract_id in failed_ids
+                    if contract_id in self._contracts
+                ]:
+                    await self._retry_contracts_data(failed_ids, semaphore)
+
+                if other_chunks_task is not None:
+                    await other_chunks_task
+
+                if new_ids := [
+                    contract_id
+                    for contract_id in self._contracts.keys()
+                    if contract_id not in speculative_ids
+                ]:
+                    _LOGGER.debug("Fetching data for new contracts: %s", new_ids)
+                    await self._fetch_contracts_data(new_ids, semaphore)
+
+        finally:
+            if other_chunks_task is not None and not other_chunks_task.done():
+                other_chunks_task.cancel()
+
+        _LOGGER.debug("Fetched %d contracts", len(self._contracts))
+
+        return self._contracts
+
+    async def _fetch_contracts_data(
+        self, contract_ids: Sequence[str], semaphore: asyncio.Semaphore
+    ) -> None:
+        """Fetch contracts data in chunks, applying chunks as they arrive"""
+        chunk_size = self.contracts_chunk_size or len(contract_ids) or 1
+
+        async def _fetch_chunk(chunk_ids: Sequence[str]) -> None:
+            async with semaphore:
+                results = await self.perform_operations(
+                    self._contracts_data_queries(chunk_ids)
+                )
+            if failed_ids := self._apply_contracts_results(chunk_ids, results):
+                await self._retry_contracts_data(failed_ids, semaphore)
+
+        # Once one chunk fails, exceptions of the others are not awaited
+        tasks = [
+            _create_background_task(_fetch_chunk(contract_ids[i : i + chunk_size]))
+            for i in range(0, len(contract_ids), chunk_size)
+        ]
+        try:
+            for future in asyncio.as_completed(tasks):
+                await future
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _retry_contracts_data(
+        self, contract_ids: Sequence[str], semaphore: asyncio.Semaphore
+    ) -> None:
+        """Refetch data only for contracts which failed within their batch.
+
+        Contracts still failing after all attempts keep their previous data;
+        an error is raised only when some of them have no data at all."""
+        for attempt in range(1, self.retry_policy.operation_attempts):
+            delay = self.retry_policy.get_delay(attempt - 1)
+            _LOGGER.debug(
+                "Retrying data fetch for contracts %s in %.1f seconds",
+                contract_ids,
+                delay,
+            )
+            await asyncio.sleep(delay)
+            # Contracts list may have dropped some of the contracts since
+            if not (
+                contract_ids := [
+                    contract_id
+                    for contract_id in contract_ids
+                    if contract_id in self._contracts
+                ]
+            ):
+                return
+            async with semaphore:
+                results = await self.perform_operations(
+                    self._contracts_data_queries(contract_ids)
+                )
+            if not (
+                contract_ids := self._apply_contracts_results(contract_ids, results)
+            ):
+                return
+
+        if any(
+            (contract := self._contracts.get(contract_id)) is not None
+            and contract.data is None
+            for contract_id in contract_ids
+        ):
+            raise QueryOperationException(
+                f"Failed to fetch data for contracts: {', '.join(contract_ids)}"
+            )
+        _LOGGER.warning(
+            "Failed to fetch data for contracts %s, keeping previous data",
+            contract_ids,
         )
 
+    def _apply_contracts_results(
+        self, contract_ids: Sequence[str], results: Sequence[OperationResult]
+    ) -> list[str]:
+        """Apply data of successfully fetched contracts, return failed ones"""
+        contracts_data, failed_ids = self._unpack_contracts_data(contract_ids, results)
+        for contract_id, data in contracts_data.items():
+            if self._contract_type_name is None and isinstance(
+                type_name := data.get("__typename"), str
+            ):
+                # Allows sharing contract selection through a fragment
+                self._contract_type_name = type_name
+            if (contract := self._contracts.get(contract_id)) is not None:
+                contract.data = data
+        if failed_ids:
+            _LOGGER.debug(
+                "Operations failed for contracts %s: %s",
+                failed_ids,
+                [result.errors for result in results if result.errors],
+            )
+        return failed_ids
+
+    def _contracts_data_queries(
+        self, contract_ids: Sequence[str]
+    ) -> list[tuple[str, dict[str, Any]]]:
+        """Build queries fetching data for given contracts"""
+        if not contract_ids:
+            return []
+        if self.aliased_contracts:
+            return [
+                (
+                    Queries.contracts_devices(
+                        len(contract_ids), self.data_features, self._contract_type_name
+                    ),
+                    Queries.contracts_devices_variables(contract_ids),
+                )
+            ]
+        contract_data_query = Queries.contract_devices(self.data_features)
+        return [
+            (contract_data_query, {"number": contract_id})
+            for contract_id in contract_ids
+        ]
+
+    def _unpack_contracts_data(
+        self, contract_ids: Sequence[str], results: Sequence[OperationResult]
+    ) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """Split results of queries built by `_contracts_data_queries`.
+
+        Aliased query may return partial data along with errors, in which
+        case contracts without errors on their path are considered fetched."""
+        contracts_data: dict[str, dict[str, Any]] = {}
+        failed_ids: list[str] = []
+        if not contract_ids:
+            return contracts_data, failed_ids
+        if self.aliased_contracts:
+            me_data = (results[0].data or {}).get("me") or {}
+            failed_aliases = {
+                error["path"][1]
+                for error in results[0].errors or ()
+                if isinstance(error, dict) and len(error.get("path") or ()) > 1
+            }
+            for i, contract_id in enumerate(contract_ids):
+                alias = "c%d" % i
+                if alias in failed_aliases:
+                    failed_ids.append(contract_id)
+                elif (data := me_data.get(alias)) is not None:
+                    contracts_data[contract_id] = data
+                else:
+                    failed_ids.append(contract_id)
+        else:
+            for contract_id, result in zip(contract_ids, results):
+                me_data = (result.data or {}).get("me") or {}
+                if result.ok and (data := me_data.get("contract")) is not None:
+                    contracts_data[contract_id] = data
+                else:
+                    failed_ids.append(contract_id)
+        return contracts_data, failed_ids
+
+    def _update_contracts_list(self, contracts_response: dict[str, Any]) -> None:
+        """Reconcile known contracts with the accounts list response"""
         contract_ids = set()
         for contract in contracts_response["me"]["contracts"]:
             device_ids = {
@@ -719,26 +2454,12 @@ class MosoblgazAPI:
             else:
                 self._contracts[contract_id] = Contract(self, contract_id, device_ids)
 
+            if (live_balance := contract.get("liveBalance")) is not None:
+                self._contracts[contract_id].live_balance_data = live_balance
+
         for contract_id in self._contracts.keys() - contract_ids:
             del self._contracts[contract_id]
 
-        if with_data:
-            contract_data_query = Queries.query("contractDevices")
-            for contract, data in zip(
-                self._contracts.values(),
-                await self.perform_queries(
-                    [
-                        (contract_data_query, {"number": contract_id})
-                        for contract_id in self._contracts.keys()
-                    ]
-                ),
-            ):
-                contract.data = data["me"]["contract"]
-
-        _LOGGER.debug(f"Fetched contracts data: {self._contracts}")
-
-        return self._contracts
-
     async def push_indication(
         self,
         contract_id: str,
@@ -753,6 +2474,8 @@ class MosoblgazAPI:
         if graphql_token is None:
             raise AuthenticationFailedException("GraphQL token required")
 
+        await self.check_service_status(SERVICE_FEATURE_PUSH, probe=True)
+
         if date_ is None:
             date_ = date.today()
         elif isinstance(date_, datetime):
@@ -761,7 +2484,8 @@ class MosoblgazAPI:
         push_url = (
             self.BASE_URL + f"/api/contracts/{contract_id}/meters/{meter_id}/values"
         )
-        async with self._session.post(
+        async with self._request(
+            "POST",
             push_url,
             json={
                 "date": date_.isoformat(),
@@ -772,10 +2496,11 @@ class MosoblgazAPI:
                 "token": graphql_token,
             },
             allow_redirects=False,
+            priority=RequestPriority.HIGH,
         ) as response:
             json_data = await response.json()
 
-        _LOGGER.debug(f"Received JSON push data from {push_url}: {json_data}")
+        self.wire_tracer.trace("Push response", {"url": push_url, "data": json_data})
 
         if not json_data["success"]:
             error_data = json_data.get("error", {})
@@ -798,8 +2523,10 @@ class Contract:
             {} if device_ids is None else dict.fromkeys(device_ids, None)
         )
         self._invoices: dict[str, dict[tuple[int, int], Invoice]] | None = None
+        self._live_balance: dict[str, Any] | None = None
 
         self._data = None
+        self._data_fingerprint: bytes | None = None
 
     def __str__(self):
         return self.__class__.__name__ + ("[%s]" % self._contract_id)
@@ -813,7 +2540,16 @@ class Contract:
 
     @data.setter
     def data(self, value: dict[str, Any]):
+        fingerprint = self.api.get_data_fingerprint(value)
+        if fingerprint == self._data_fingerprint and None not in self._devices.values():
+            # Document has not changed since last update, except for balance
+            self._data = value
+            self._live_balance = value.get("liveBalance")
+            return
+
         self._data = value
+        self._live_balance = value.get("liveBalance")
+        self._data_fingerprint = None
 
         device_ids = set()
         for device_data in self.devices_data:
@@ -845,7 +2581,9 @@ class Contract:
             self._invoices = {}
 
         for invoice_group in INVOICE_GROUPS:
-            invoice_data = self._data["calculationsAndPayments"].get(invoice_group)
+            invoice_data = (self._data.get("calculationsAndPayments") or {}).get(
+                invoice_group
+            )
             invoices = self._invoices.setdefault(invoice_group, {})
 
             if invoice_data:
@@ -864,6 +2602,8 @@ class Contract:
                 for invoice_key in invoices.keys() - invoice_periods:
                     del invoices[invoice_key]
 
+        self._data_fingerprint = fingerprint
+
     @property
     def _property_data(self) -> dict[str, Any]:
         if self._data is None:
@@ -893,6 +2633,11 @@ class Contract:
     def has_devices(self):
         return bool(self._devices)
 
+    @property
+    def needs_data(self) -> bool:
+        """Check whether contract lacks data for its contents"""
+        return self._data is None or None in self._devices.values()
+
     @property
     def devices(self):
         if None in self._devices.values():
@@ -905,7 +2650,12 @@ class Contract:
         return {i: d for i, d in self.devices.items() if isinstance(d, Meter)}
 
     async def update_data(self):
-        contract_data_query = Queries.query("contractDevices")
+        await self.api._single_flight(
+            ("update_data", self._contract_id), self._update_data
+        )
+
+    async def _update_data(self):
+        contract_data_query = Queries.contract_devices(self.api.data_features)
         response = await self.api.perform_single_query(
             contract_data_query, {"number": self._contract_id}
         )
@@ -958,12 +2708,20 @@ class Contract:
     def invoices_vdgo(self) -> dict[tuple[int, int], "Invoice"]:
         return self.all_invoices_by_groups[INVOICE_GROUP_VDGO]
 
+    @property
+    def live_balance_data(self) -> dict[str, Any] | None:
+        return self._live_balance
+
+    @live_balance_data.setter
+    def live_balance_data(self, value: dict[str, Any] | None) -> None:
+        self._live_balance = value
+
     @property
     def balance(self):
-        return round(
-            float(self._property_data.get("liveBalance", {}).get("liveBalance", 0.0)),
-            2,
-        )
+        live_balance = self._live_balance
+        if live_balance is None:
+            live_balance = self._property_data.get("liveBalance") or {}
+        return round(float(live_balance.get("liveBalance") or 0.0), 2)
 
     @property
     def devices_data(self) -> list[dict[str, Any]]:
@@ -980,7 +2738,7 @@ class Contract:
 
     @property
     def history_data(self):
-        return self._property_data["metersHistory"]["data"]
+        return (self._property_data.get("metersHistory") or {}).get("data") or []
 
     async def push_indication(
         self,
@@ -992,9 +2750,35 @@ class Contract:
 
 
 class Device:
+    __slots__ = (
+        "_contract",
+        "_data",
+        "device_id",
+        "is_active",
+        "is_archived",
+        "device_class_code",
+        "device_class",
+        "device_class_name",
+        "end_of_life_date",
+        "model",
+        "manufacturer",
+        "serial",
+    )
+
+    device_id: str
+    is_active: bool
+    is_archived: bool
+    device_class_code: int
+    device_class: str | None
+    device_class_name: str | None
+    end_of_life_date: date | None
+    model: str | None
+    manufacturer: str | None
+    serial: str | None
+
     def __init__(self, contract: Contract, data: DeviceDataType):
         self._contract = contract
-        self._data = data
+        self.data = data
 
     def __str__(self):
         return f"Device[{self.device_id}]"
@@ -1006,10 +2790,6 @@ class Device:
     def contract(self) -> "Contract":
         return self._contract
 
-    @property
-    def device_id(self) -> str:
-        return self._data["ID"]
-
     @property
     def data(self) -> DeviceDataType:
         return self._data
@@ -1017,64 +2797,41 @@ class Device:
     @data.setter
     def data(self, value: DeviceDataType):
         self._data = value
+        self.device_id = value["ID"]
 
-    @property
-    def is_active(self) -> bool:
-        status = self.data.get("Status")
-        return status is None or status != 1
-
-    @property
-    def is_archived(self) -> bool:
-        archived = self.data.get("Archived")
-        if archived is None:
-            return False
-        return str(archived) != "false"
+        status = value.get("Status")
+        self.is_active = status is None or status != 1
 
-    @property
-    def device_class_code(self) -> int:
-        return int(self.data.get("ClassCode", -1))
-
-    @property
-    def end_of_life_date(self) -> date | None:
-        end_of_life_date = self.data.get("ExplEndDate")
-        if end_of_life_date:
-            return date.fromisoformat(end_of_life_date)
+        archived = value.get("Archived")
+        self.is_archived = archived is not None and str(archived) != "false"
 
-    @property
-    def device_class(self) -> str | None:
+        self.device_class_code = int(value.get("ClassCode", -1))
         try:
-            return list(ClassCodes.__dict__.keys())[
-                list(ClassCodes.__dict__.values()).index(self.device_class_code)
-            ].lower()
-        except (IndexError, ValueError):
-            return None
-
-    @property
-    def device_class_name(self) -> str:
-        return self.data["ClassName"]
+            self.device_class = ClassCodes(self.device_class_code).name.lower()
+        except ValueError:
+            self.device_class = None
 
-    @property
-    def model(self) -> str:
-        return self.data["Model"]
+        self.end_of_life_date = parse_date(value.get("ExplEndDate"))
+        self.device_class_name = value.get("ClassName")
+        self.model = value.get("Model")
+        self.manufacturer = value.get("ManfFirm")
+        self.serial = value.get("ManfNo")
 
-    @property
-    def manufacturer(self) -> str:
-        return self.data["ManfFirm"]
 
-    @property
-    def serial(self) -> str | None:
-        return self.data.get("ManfNo")
+class Meter(Device):
+    __slots__ = ("date_next_check", "_history", "_last_history_period")
 
+    date_next_check: date | None
 
-class Meter(Device):
     def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
         self._history = None
         self._last_history_period = None
+        super().__init__(*args, **kwargs)
 
-    @property
-    def date_next_check(self) -> date:
-        return date.fromisoformat(self.data["DateNextCheck"])
+    @Device.data.setter
+    def data(self, value: DeviceDataType):
+        Device.data.fset(self, value)
+        self.date_next_check = parse_date(value.get("DateNextCheck"))
 
     @property
     def history(self) -> dict[tuple[int, int, int], "HistoryEntry"] | None:
@@ -1087,23 +2844,34 @@ class Meter(Device):
 
         last_history_period = (0, 0, 0)
         for history_data in value:
-            history_date = convert_date_dict(history_data["Date"])
-            period = (history_date.year, history_date.month, history_date.day)
+            try:
+                history_date = convert_date_dict(history_data["Date"])
+                period = (history_date.year, history_date.month, history_date.day)
+
+                if period in self._history:
+                    self._history[period].set_data(history_data, history_date)
+                else:
+                    self._history[period] = HistoryEntry(
+                        self, history_data, history_date
+                    )
+            except (KeyError, TypeError, ValueError) as exc:
+                # Zero reading would be taken for a meter reset
+                _LOGGER.warning(
+                    "Skipping malformed history entry of meter %s: %s",
+                    self.device_id,
+                    exc,
+                )
+                continue
 
             if period > last_history_period:
                 last_history_period = period
 
-            if period in self._history:
-                self._history[period].data = history_data
-            else:
-                self._history[period] = HistoryEntry(self, history_data)
-
         self._last_history_period = last_history_period
 
     @property
     def last_history_entry(self) -> "HistoryEntry | None":
         if self._history is not None:
-            return self.history[self._last_history_period]
+            return self._history.get(self._last_history_period)
 
     async def push_indication(
         self,
@@ -1119,13 +2887,32 @@ class Meter(Device):
 
 
 class HistoryEntry:
-    def __init__(self, meter: "Meter", data: HistoryEntryDataType):
-        self._meter = meter
-        self.data = data
+    __slots__ = (
+        "_meter",
+        "_data",
+        "collected_at",
+        "cost",
+        "delta",
+        "previous_value",
+        "value",
+        "charged",
+    )
 
-    @property
-    def collected_at(self) -> datetime:
-        return convert_date_dict(self._data["Date"])
+    collected_at: datetime
+    cost: float
+    delta: int
+    previous_value: int
+    value: int
+    charged: float
+
+    def __init__(
+        self,
+        meter: "Meter",
+        data: HistoryEntryDataType,
+        collected_at: datetime | None = None,
+    ):
+        self._meter = meter
+        self.set_data(data, collected_at)
 
     @property
     def meter(self):
@@ -1137,32 +2924,53 @@ class HistoryEntry:
 
     @data.setter
     def data(self, value: HistoryEntryDataType):
-        self._data = value
-
-    @property
-    def cost(self) -> float:
-        return float(self._data.get("Cost") or 0.0)
-
-    @property
-    def delta(self) -> int:
-        if "M3" in self._data:
-            return int(self._data.get("M3") or 0)
-        return self.value - self.previous_value
+        self.set_data(value)
+
+    def set_data(
+        self, value: HistoryEntryDataType, collected_at: datetime | None = None
+    ) -> None:
+        """Set entry data, optionally with collection time parsed by caller.
+
+        Raises ValueError on malformed readings, leaving entry unchanged."""
+        if collected_at is None:
+            collected_at = convert_date_dict(value["Date"])
+        cost = float(value.get("Cost") or 0.0)
+        previous_value = parse_reading(value.get("prevV"))
+        current_value = parse_reading(value.get("V"))
+        if "M3" in value:
+            delta = parse_reading(value.get("M3") or 0)
+        else:
+            delta = current_value - previous_value
 
-    @property
-    def previous_value(self) -> int:
-        return int(self._data.get("prevV") or 0)
+        self._data = value
+        self.collected_at = collected_at
+        self.cost = cost
+        self.previous_value = previous_value
+        self.value = current_value
+        self.delta = delta
+        self.charged = round(cost * delta, 2)
 
-    @property
-    def value(self) -> int:
-        return int(self._data.get("V") or 0)
 
-    @property
-    def charged(self) -> float:
-        return round(self.cost * self.delta, 2)
+class Invoice:
+    __slots__ = (
+        "_contract",
+        "_group",
+        "_period",
+        "_payments",
+        "_data",
+        "_data_proxy",
+        "balance",
+        "paid",
+        "total",
+    )
 
+    balance: float
+    """Balance at the moment of invoice issue"""
+    paid: float
+    """Paid amount (if available)"""
+    total: float
+    """Invoice total"""
 
-class Invoice:
     def __init__(
         self,
         contract: Contract,
@@ -1187,7 +2995,7 @@ class Invoice:
     @property
     def data(self) -> InvoiceDataType:
         """Invoice data getter"""
-        return MappingProxyType(self._data)
+        return self._data_proxy
 
     @data.setter
     def data(self, value: InvoiceDataType) -> None:
@@ -1203,16 +3011,10 @@ class Invoice:
                 self._payments.append(Payment(payment_data))
 
         self._data = value
-
-    @property
-    def balance(self) -> float:
-        """Balance at the moment of invoice issue"""
-        return round(float(self._data.get("balance") or 0.0), 2)
-
-    @property
-    def paid(self) -> float:
-        """Paid amount (if available)"""
-        return round(float(self._data.get("payment") or 0.0), 2)
+        self._data_proxy = MappingProxyType(value)
+        self.balance = round(float(value.get("balance") or 0.0), 2)
+        self.paid = round(float(value.get("payment") or 0.0), 2)
+        self.total = round(float(value.get("invoice") or 0.0), 2)
 
     @property
     def payments(self) -> list["Payment"]:
@@ -1229,22 +3031,18 @@ class Invoice:
         """Invoice period"""
         return self._period
 
-    @property
-    def total(self) -> float:
-        """Invoice total"""
-        return round(float(self._data.get("invoice") or 0.0), 2)
-
 
 class Payment:
     """Payment class"""
 
+    __slots__ = ("_data", "datetime")
+
+    datetime: "datetime | None"
+
     # @TODO: add more properties
     def __init__(self, data: dict[str, Any]):
         self._data = data
-
-    @property
-    def datetime(self) -> datetime:
-        return convert_date_dict(self._data["date"])
+        self.datetime = parse_date_dict(data.get("date"))
 
 
 class MosoblgazException(Exception):
@@ -1263,6 +3061,26 @@ class QueryFailedException(RequestFailedException):
     """Query request failed"""
 
 
+class QueryOperationException(QueryFailedException):
+    """Operation within query request returned errors"""
+
+
+class QueryTimeoutException(QueryFailedException):
+    """Query request timed out"""
+
+
+class QueryServerErrorException(QueryFailedException):
+    """Server failed to process query request"""
+
+
+class QueryDecodingException(QueryFailedException):
+    """Query response could not be decoded"""
+
+
+class CircuitOpenException(RequestFailedException):
+    """Requests are suspended after consecutive failures"""
+
+
 class QueryNotFoundException(MosoblgazException):
     """Query not found"""
 
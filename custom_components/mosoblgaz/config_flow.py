@@ -31,9 +31,23 @@ from custom_components.mosoblgaz.api import (
     PartialOfflineException,
 )
 from custom_components.mosoblgaz.const import (
+    CONF_BALANCE_SCAN_INTERVAL,
+    CONF_CONTRACTS_CHUNK_SIZE,
     CONF_GRAPHQL_TOKEN,
     CONF_INVERT_INVOICES,
+    CONF_MAX_CONCURRENT_CHUNKS,
+    CONF_PERSISTED_QUERIES,
+    CONF_PROFILE_RESPONSES,
+    CONF_WIRE_TRACE_BUFFER_SIZE,
+    CONF_WIRE_TRACE_SAMPLE_RATE,
+    DEFAULT_BALANCE_SCAN_INTERVAL,
+    DEFAULT_CONTRACTS_CHUNK_SIZE,
     DEFAULT_INVERT_INVOICES,
+    DEFAULT_MAX_CONCURRENT_CHUNKS,
+    DEFAULT_PERSISTED_QUERIES,
+    DEFAULT_PROFILE_RESPONSES,
+    DEFAULT_WIRE_TRACE_BUFFER_SIZE,
+    DEFAULT_WIRE_TRACE_SAMPLE_RATE,
     DEFAULT_SCAN_INTERVAL,
     DEFAULT_TIMEOUT,
     DOMAIN,
@@ -266,6 +280,27 @@ OPTIONS_SCHEMA: Final[vol.Schema] = vol.Schema(
         vol.Optional(
             CONF_SCAN_INTERVAL, default=DEFAULT_SCAN_INTERVAL
         ): cv.positive_int,
+        vol.Optional(
+            CONF_BALANCE_SCAN_INTERVAL, default=DEFAULT_BALANCE_SCAN_INTERVAL
+        ): cv.positive_int,
+        vol.Optional(
+            CONF_CONTRACTS_CHUNK_SIZE, default=DEFAULT_CONTRACTS_CHUNK_SIZE
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_MAX_CONCURRENT_CHUNKS, default=DEFAULT_MAX_CONCURRENT_CHUNKS
+        ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+        vol.Optional(
+            CONF_PERSISTED_QUERIES, default=DEFAULT_PERSISTED_QUERIES
+        ): cv.boolean,
+        vol.Optional(
+            CONF_PROFILE_RESPONSES, default=DEFAULT_PROFILE_RESPONSES
+        ): cv.boolean,
+        vol.Optional(
+            CONF_WIRE_TRACE_BUFFER_SIZE, default=DEFAULT_WIRE_TRACE_BUFFER_SIZE
+        ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+        vol.Optional(
+            CONF_WIRE_TRACE_SAMPLE_RATE, default=DEFAULT_WIRE_TRACE_SAMPLE_RATE
+        ): vol.All(vol.Coerce(float), vol.Range(min=0.0, max=1.0)),
     }
 )
 
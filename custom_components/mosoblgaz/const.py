@@ -6,12 +6,36 @@ PLATFORMS = ["sensor"]
 
 CONF_GRAPHQL_TOKEN: Final = "graphql_token"
 CONF_INVERT_INVOICES: Final = "invert_invoices"
+CONF_BALANCE_SCAN_INTERVAL: Final = "balance_scan_interval"
+CONF_CONTRACTS_CHUNK_SIZE: Final = "contracts_chunk_size"
+CONF_MAX_CONCURRENT_CHUNKS: Final = "max_concurrent_chunks"
+CONF_PERSISTED_QUERIES: Final = "persisted_queries"
+CONF_PROFILE_RESPONSES: Final = "profile_responses"
+CONF_WIRE_TRACE_BUFFER_SIZE: Final = "wire_trace_buffer_size"
+CONF_WIRE_TRACE_SAMPLE_RATE: Final = "wire_trace_sample_rate"
 
 DOMAIN: Final = "mosoblgaz"
 
+STORAGE_VERSION: Final = 1
+STORAGE_KEY_X_SYSTEM_AUTH: Final = DOMAIN + ".x_system_auth"
+STORAGE_KEY_SESSION: Final = DOMAIN + ".session.{}"
+
+DATA_CONNECTOR: Final = DOMAIN + "_connector"
+
+CONNECTOR_LIMIT_PER_HOST: Final = 4
+CONNECTOR_KEEPALIVE_TIMEOUT: Final = 60  # 1 minute
+CONNECTOR_DNS_CACHE_TTL: Final = 5 * 60  # 5 minutes
+
 DEFAULT_SCAN_INTERVAL: Final = 60 * 60  # 1 hour
+DEFAULT_BALANCE_SCAN_INTERVAL: Final = 0  # disabled, balance updates with data
 DEFAULT_TIMEOUT: Final = 30  # 30 seconds
 DEFAULT_INVERT_INVOICES: Final = False
+DEFAULT_CONTRACTS_CHUNK_SIZE: Final = 10
+DEFAULT_MAX_CONCURRENT_CHUNKS: Final = 2
+DEFAULT_PERSISTED_QUERIES: Final = False
+DEFAULT_PROFILE_RESPONSES: Final = False
+DEFAULT_WIRE_TRACE_BUFFER_SIZE: Final = 0  # disabled
+DEFAULT_WIRE_TRACE_SAMPLE_RATE: Final = 1.0
 
 FEATURE_PUSH_INDICATIONS: Final = 1
 
@@ -39,6 +63,7 @@ ATTR_INDICATION: Final = "indication"
 ATTR_IGNORE_INDICATIONS: Final = "ignore_indications"
 ATTR_INCREMENTAL: Final = "incremental"
 ATTR_RETURN_ON_ERROR: Final = "return_on_error"
+ATTR_DEFERRED: Final = "deferred"
 
 # Contract attributes
 ATTR_ADDRESS: Final = "address"
@@ -0,0 +1,33 @@
+"""Mosoblgaz diagnostics"""
+
+__all__ = ["async_get_config_entry_diagnostics"]
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.mosoblgaz.const import DOMAIN
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    data: dict[str, Any] = {"options": dict(entry.options)}
+
+    if (coordinator := hass.data.get(DOMAIN, {}).get(entry.entry_id)) is None:
+        return data
+
+    api = coordinator.api
+    data["rate_limits"] = api.rate_limiter.metrics
+    if api.response_profiler is not None:
+        data["response_profile"] = api.response_profiler.report()
+    if api.wire_tracer.buffer is not None:
+        # Records are redacted when traced
+        data["wire_trace"] = [
+            {"time": traced_at, "event": event, "data": record}
+            for traced_at, event, record in api.wire_tracer.buffer
+        ]
+
+    return data
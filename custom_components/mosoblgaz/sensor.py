@@ -5,7 +5,7 @@ Retrieves values regarding current state of contracts.
 
 from abc import ABC
 import asyncio
-from datetime import date
+from datetime import date, datetime
 import logging
 from typing import Any, Generic, Mapping, TypeVar, Union, final
 
@@ -21,7 +21,7 @@ from homeassistant.components.sensor import (
     SensorStateClass,
 )
 from homeassistant.const import ATTR_ENTITY_ID, ATTR_MODEL, EntityCategory, UnitOfVolume
-from homeassistant.core import HomeAssistant, SupportsResponse
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, SupportsResponse, callback
 
 from custom_components.mosoblgaz import (
     MosoblgazCoordinatorEntity,
@@ -36,6 +36,7 @@ from custom_components.mosoblgaz.api import (
     Device,
     Meter,
     MosoblgazException,
+    get_blackout_end,
 )
 from custom_components.mosoblgaz.const import *
 
@@ -263,6 +264,7 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
 
     def __init__(self, coordinator, device: Meter):
         super().__init__(coordinator, device)
+        self._unsub_held_push: CALLBACK_TYPE | None = None
 
         # Set initial attributes
         self._attr_unique_id = "meter_{}".format(device.device_id)
@@ -295,6 +297,29 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
             (FEATURE_PUSH_INDICATIONS,),
             supports_response=SupportsResponse.OPTIONAL,
         )
+        self.async_on_remove(self._async_cancel_held_push)
+
+    @callback
+    def _async_cancel_held_push(self) -> None:
+        if self._unsub_held_push is not None:
+            self._unsub_held_push()
+            self._unsub_held_push = None
+
+    @callback
+    def _async_hold_push(self, blackout_end: datetime, call_data: Mapping) -> None:
+        """Submit indications once the maintenance window is over.
+
+        Only the latest held submission is kept; its outcome is reported
+        with the same event as the immediate submissions."""
+        self._async_cancel_held_push()
+
+        async def _async_push(_now: datetime) -> None:
+            self._unsub_held_push = None
+            await self.async_service_push_indications(**call_data)
+
+        self._unsub_held_push = self.coordinator.async_call_after_blackout(
+            blackout_end, _async_push
+        )
 
     def _handle_device_update(self):
         """Extrapolate data for meter"""
@@ -345,7 +370,7 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
         :param call_data: Parameters for service call
         :return:
         """
-        _LOGGER.info(f"{self} Begin handling indications submission")
+        _LOGGER.info("%s Begin handling indications submission", self)
 
         meter = self.device
 
@@ -361,6 +386,7 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
             ATTR_SUCCESS: False,
             ATTR_INDICATIONS: None,
             ATTR_COMMENT: "Response comment not provided",
+            ATTR_DEFERRED: False,
         }
 
         try:
@@ -373,6 +399,24 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
             new_indication = indications["t1"]
             event_data[ATTR_INDICATION] = new_indication  # integration-specific
 
+            if (blackout_end := get_blackout_end()) is not None:
+                # Submissions are rejected by the server during maintenance
+                self._async_hold_push(
+                    blackout_end,
+                    {
+                        **call_data,
+                        ATTR_INDICATIONS: dict(indications),
+                        ATTR_INCREMENTAL: False,
+                        ATTR_RETURN_ON_ERROR: True,
+                    },
+                )
+                event_data[ATTR_DEFERRED] = True
+                event_data[ATTR_COMMENT] = (
+                    "Indications submission deferred until maintenance window "
+                    f"ends at {blackout_end:%H:%M %Z}"
+                )
+                return event_data
+
             await meter.push_indication(
                 new_indication,
                 ignore_values=call_data[ATTR_IGNORE_INDICATIONS],
@@ -403,7 +447,7 @@ class MosoblgazMeterSensor(MosoblgazBaseDeviceSensor[Meter]):
             _LOGGER.info("End handling indications submission")
 
         try:
-            await self.coordinator.async_request_refresh()
+            await self.coordinator.async_request_full_refresh()
         except asyncio.CancelledError:
             raise
         except BaseException as exc:
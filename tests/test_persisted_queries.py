@@ -0,0 +1,97 @@
+"""Persisted queries probing and fallback against a stand-in GraphQL server"""
+
+import asyncio
+import importlib.util
+from pathlib import Path
+
+import pytest
+from aiohttp import web
+
+_API_PATH = Path(__file__).parents[1] / "custom_components" / "mosoblgaz" / "api.py"
+_spec = importlib.util.spec_from_file_location("mosoblgaz_api", _API_PATH)
+api = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(api)
+
+QUERY = "query getTest { test }"
+
+
+class StandInServer:
+    """Batch endpoint which treats persisted queries according to its mode.
+
+    Modes: `apq` retains registered hashes, `forgetful` never retains them,
+    `unsupported` rejects persisted queries, `ignorant` does not know them."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.requests: list[str] = []
+        self.hashes: set[str] = set()
+
+    def _resolve(self, operation: dict) -> dict:
+        persisted = (operation.get("extensions") or {}).get("persistedQuery")
+        query = operation.get("query")
+        self.requests.append("hash" if query is None else "full")
+
+        if persisted is not None and self.mode == "unsupported":
+            return {"errors": [{"message": api.PERSISTED_QUERY_NOT_SUPPORTED}]}
+        if query is None:
+            if self.mode == "ignorant":
+                return {"errors": [{"message": "Must provide query string."}]}
+            if persisted["sha256Hash"] not in self.hashes:
+                return {"errors": [{"message": api.PERSISTED_QUERY_NOT_FOUND}]}
+        elif persisted is not None and self.mode == "apq":
+            self.hashes.add(persisted["sha256Hash"])
+        return {"data": {"test": True}}
+
+    async def handle(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            [self._resolve(operation) for operation in await request.json()]
+        )
+
+
+async def _run(mode: str, calls: int) -> tuple[StandInServer, "api.MosoblgazAPI"]:
+    server = StandInServer(mode)
+    app = web.Application()
+    app.router.add_post("/graphql/batch", server.handle)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    host, port = runner.addresses[0][:2]
+
+    class StandInAPI(api.MosoblgazAPI):
+        BATCH_URL = f"http://{host}:{port}/graphql/batch"
+
+    client = StandInAPI(
+        "username",
+        "password",
+        graphql_token="token",
+        x_system_auth_token="token",
+        persisted_queries=True,
+        circuit_breaker=api.CircuitBreaker(),
+    )
+    try:
+        for _ in range(calls):
+            (result,) = await client.perform_operations([QUERY])
+            assert result.unwrap() == {"test": True}
+    finally:
+        await client._session.close()
+        await runner.cleanup()
+    return server, client
+
+
+@pytest.mark.parametrize(
+    ("mode", "supported", "requests"),
+    [
+        # probe, unknown hash, registration, known hash
+        ("apq", True, ["hash", "hash", "full", "hash"]),
+        # probe, unknown hash, registration, forgotten hash, full document
+        ("forgetful", True, ["hash", "hash", "full", "hash", "full", "full"]),
+        ("unsupported", False, ["hash", "full", "full"]),
+        ("ignorant", False, ["hash", "full", "full"]),
+    ],
+)
+def test_persisted_queries_fallback(mode, supported, requests):
+    calls = 3 if mode == "forgetful" else 2
+    server, client = asyncio.run(_run(mode, calls))
+    assert client.persisted_queries_supported is supported
+    assert server.requests == requests